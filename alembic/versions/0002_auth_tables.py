@@ -0,0 +1,95 @@
+"""Token version, hashed verification/refresh tokens and the email outbox
+
+Revision ID: 0002_auth_tables
+Revises: 0001_baseline
+Create Date: 2025-01-02 00:00:00
+
+Databases set up by the old start-up create_all may already have some of
+these objects, so every step checks first (offline --sql runs assume none).
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.migrations import create_index_concurrently, inspector
+
+revision = "0002_auth_tables"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    existing = inspector()
+    has_table = existing.has_table if existing is not None else (lambda name: False)
+    user_columns = (
+        {column["name"] for column in existing.get_columns("users")}
+        if existing is not None
+        else {"verification_token"}
+    )
+    if "token_version" not in user_columns or "verification_token" in user_columns:
+        with op.batch_alter_table("users") as batch:
+            if "token_version" not in user_columns:
+                batch.add_column(sa.Column("token_version", sa.Integer(), server_default="0", nullable=False))
+            if "verification_token" in user_columns:
+                batch.drop_column("verification_token")
+
+    if not has_table("verification_tokens"):
+        op.create_table(
+            "verification_tokens",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("token_hash", sa.String(length=64), nullable=False),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if not has_table("refresh_tokens"):
+        op.create_table(
+            "refresh_tokens",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("family_id", sa.String(length=32), nullable=False),
+            sa.Column("token_hash", sa.String(length=64), nullable=False),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("used_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("token_hash"),
+        )
+    if not has_table("email_outbox"):
+        op.create_table(
+            "email_outbox",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("kind", sa.String(), nullable=False),
+            sa.Column("to_email", sa.String(), nullable=False),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("last_error", sa.String(), nullable=True),
+            sa.Column("available_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    # Secondary indexes are built concurrently so they never block writes
+    create_index_concurrently("ix_verification_tokens_user_id", "verification_tokens", ["user_id"])
+    create_index_concurrently("ix_verification_tokens_expires_at", "verification_tokens", ["expires_at"])
+    create_index_concurrently(
+        "ix_verification_tokens_token_hash", "verification_tokens", ["token_hash"], postgresql_using="hash"
+    )
+    create_index_concurrently("ix_refresh_tokens_user_id", "refresh_tokens", ["user_id"])
+    create_index_concurrently("ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"])
+    create_index_concurrently("ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"])
+    create_index_concurrently("ix_email_outbox_id", "email_outbox", ["id"])
+    create_index_concurrently("ix_email_outbox_status_available_at", "email_outbox", ["status", "available_at"])
+
+def downgrade():
+    op.drop_table("email_outbox")
+    op.drop_table("refresh_tokens")
+    op.drop_table("verification_tokens")
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("verification_token", sa.String(), nullable=True))
+        batch.drop_column("token_version")
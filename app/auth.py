@@ -1,16 +1,26 @@
 # app/auth.py
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from jose import JWTError
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from .config import settings
-from .models import User
+from .database import session_scope
+from .hashing import HashingPoolSaturated, hashing_pool
+from .keys import get_key_ring
+from .models import RefreshToken, User, VerificationToken
+from .passwords import pwd_context
+from .revocation import revocation_list
+from .token_memo import token_memo
 from .schemas import TokenData
+from .user_cache import UserSnapshot, invalidate_user, load_shared, store_shared, user_cache
+import asyncio
+import hashlib
 import secrets
 import string
+import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -18,54 +28,302 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool instead of the event loop"""
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool instead of the event loop"""
+    return await hashing_pool.run(get_password_hash, password)
+
+async def get_password_hashes_async(passwords: List[str]) -> List[str]:
+    """Hash many passwords concurrently, holding at most one pool slot per worker"""
+    slots = asyncio.Semaphore(hashing_pool.workers)
+
+    async def hash_one(password: str) -> str:
+        async with slots:
+            return await get_password_hash_async(password)
+
+    return list(await asyncio.gather(*(hash_one(password) for password in passwords)))
+
 def generate_verification_token() -> str:
     """Generate a secure random verification token"""
     alphabet = string.ascii_letters + string.digits
     return ''.join(secrets.choice(alphabet) for _ in range(32))
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
-    user = db.query(User).filter(User.username == username).first()
+def hash_token(token: str) -> str:
+    """Digest stored in place of a random token, so a DB dump exposes no usable tokens"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+async def issue_verification_token(db: AsyncSession, user_id: int) -> str:
+    """Replace the user's verification tokens with a new one; returns the raw token"""
+    token = generate_verification_token()
+    await db.execute(delete(VerificationToken).where(VerificationToken.user_id == user_id))
+    db.add(VerificationToken(
+        user_id=user_id,
+        token_hash=hash_token(token),
+        expires_at=datetime.utcnow() + timedelta(hours=settings.verification_token_ttl_hours),
+    ))
+    return token
+
+def issue_verification_tokens(db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, str]:
+    """Stage tokens for newly created users (who have none to replace); returns raw tokens by user id"""
+    expires_at = datetime.utcnow() + timedelta(hours=settings.verification_token_ttl_hours)
+    tokens = {user_id: generate_verification_token() for user_id in user_ids}
+    db.add_all([
+        VerificationToken(user_id=user_id, token_hash=hash_token(token), expires_at=expires_at)
+        for user_id, token in tokens.items()
+    ])
+    return tokens
+
+INSERT_CONSTRUCTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+async def insert_users(db: AsyncSession, rows: List[dict]) -> List[Tuple[int, str, str]]:
+    """Multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING; returns (id, email, username) of created rows"""
+    insert = INSERT_CONSTRUCTS[db.bind.dialect.name]
+    result = await db.execute(
+        insert(User).values(rows).on_conflict_do_nothing().returning(User.id, User.email, User.username)
+    )
+    return [tuple(row) for row in result.all()]
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+LOOKUP_COLUMNS = {"id": User.id, "username": User.username, "email": User.email}
+
+async def lookup_user(db: AsyncSession, field: str, value) -> Optional[UserSnapshot]:
+    """Read-only user lookup by id, username or email, served from the user cache when possible"""
+    if settings.user_cache_enabled:
+        snapshot = user_cache.get(field, value)
+        if snapshot is not None:
+            return snapshot
+        if settings.user_cache_shared:
+            snapshot = await load_shared(field, value)
+            if snapshot is not None:
+                user_cache.put(snapshot)
+                return snapshot
+    result = await db.execute(select(User).where(LOOKUP_COLUMNS[field] == value))
+    user = result.scalars().first()
+    if user is None:
+        return None
+    snapshot = UserSnapshot.from_user(user)
+    if settings.user_cache_enabled:
+        user_cache.put(snapshot)
+        if settings.user_cache_shared:
+            await store_shared(snapshot)
+    return snapshot
+
+async def invalidate_cached_user(user):
+    await invalidate_user(id=user.id, username=user.username, email=user.email)
+
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[UserSnapshot]:
+    user = await lookup_user(db, "username", username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     # Check if user is verified
     if not user.is_verified:
         return None  # User exists but email not verified
+    if pwd_context.needs_update(user.hashed_password):
+        schedule_rehash(user, password)
     return user
 
+# Users whose password is being re-hashed, and the background tasks doing it
+_rehashing: Set[int] = set()
+_rehash_tasks: Set[asyncio.Task] = set()
+
+def schedule_rehash(user: UserSnapshot, password: str):
+    """Upgrade a hash to the current policy after the login response, not before it"""
+    if user.id in _rehashing:
+        return
+    _rehashing.add(user.id)
+    task = asyncio.create_task(_rehash_password(user, password))
+    _rehash_tasks.add(task)
+    task.add_done_callback(_rehash_tasks.discard)
+
+async def _rehash_password(user: UserSnapshot, password: str):
+    try:
+        new_hash = await get_password_hash_async(password)
+        async with session_scope() as db:
+            # Only replace the hash we verified; a concurrent password change wins
+            await db.execute(
+                update(User)
+                .where(User.id == user.id, User.hashed_password == user.hashed_password)
+                .values(hashed_password=new_hash)
+            )
+            await db.commit()
+        await invalidate_cached_user(user)
+    except HashingPoolSaturated:
+        pass  # Busy: the next login tries again
+    except Exception as e:
+        print(f"❌ Password re-hash failed for user {user.id}: {e}")
+    finally:
+        _rehashing.discard(user.id)
+
+async def drain_rehashes():
+    """Wait for in-flight re-hashes (shutdown, tests)"""
+    if _rehash_tasks:
+        await asyncio.gather(*_rehash_tasks, return_exceptions=True)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    # jti identifies the token for revocation on logout
+    to_encode.update({"exp": expire, "jti": secrets.token_hex(16)})
+    encoded_jwt = get_key_ring().sign(to_encode)
     return encoded_jwt
 
-def verify_token(token: str) -> Optional[TokenData]:
+def _epoch(value: Optional[datetime]) -> Optional[int]:
+    return int(value.timestamp()) if value is not None else None
+
+def access_token_claims(user: User) -> dict:
+    """Claims for a user's access token; includes the principal in stateless mode"""
+    claims = {"sub": user.username}
+    if settings.jwt_stateless_auth:
+        claims.update({
+            "uid": user.id,
+            "email": user.email,
+            "act": user.is_active,
+            "vfd": user.is_verified,
+            "cat": _epoch(user.created_at),
+            "vat": _epoch(user.verified_at),
+            "tv": user.token_version or 0,
+        })
+    return claims
+
+def _decode_token(token: str) -> Optional[TokenData]:
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        token_data = TokenData(username=username)
-        return token_data
+        payload = get_key_ring().decode(token)
     except JWTError:
         return None
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+    return TokenData(
+        username=username,
+        user_id=payload.get("uid"),
+        email=payload.get("email"),
+        is_active=payload.get("act"),
+        is_verified=payload.get("vfd"),
+        created_at=payload.get("cat"),
+        verified_at=payload.get("vat"),
+        token_version=payload.get("tv"),
+        jti=payload.get("jti"),
+        expires_at=payload.get("exp"),
+    )
+
+# Revoked tokens leave the memo as soon as this worker hears about them
+revocation_list.add_listener(token_memo.discard_jti)
+
+async def verify_token(token: str) -> Optional[TokenData]:
+    # Repeated bearer tokens skip signature verification and model construction
+    token_data = token_memo.get(token)
+    if token_data is None:
+        start = time.perf_counter()
+        token_data = _decode_token(token)
+        token_memo.record_decode(time.perf_counter() - start)
+        if token_data is None:
+            return None
+        token_memo.put(token, token_data)
+    if token_data.jti is not None and await revocation_list.is_revoked(token_data.jti):
+        return None
+    return token_data
 
-def verify_email_token(db: Session, token: str) -> Optional[User]:
-    """Verify email verification token and return user"""
-    user = db.query(User).filter(User.verification_token == token).first()
+async def verify_email_token(db: AsyncSession, token: str) -> Optional[User]:
+    """Mark the token's user as verified; the caller commits and invalidates the user cache"""
+    result = await db.execute(
+        select(User)
+        .join(VerificationToken, VerificationToken.user_id == User.id)
+        .where(
+            VerificationToken.token_hash == hash_token(token),
+            VerificationToken.expires_at > datetime.utcnow(),
+        )
+    )
+    user = result.scalars().first()
     if not user:
         return None
     
     # Mark user as verified
     user.is_verified = True
-    user.verification_token = None  # Clear the token
     user.verified_at = datetime.utcnow()
-    db.commit()
-    db.refresh(user)
+    await db.execute(delete(VerificationToken).where(VerificationToken.user_id == user.id))
+    await db.flush()
     
-    return user
\ No newline at end of file
+    return user
+
+async def _purge_expired(db: AsyncSession, model, batch_size: int) -> int:
+    removed = 0
+    while True:
+        expired_ids = (
+            select(model.id)
+            .where(model.expires_at <= datetime.utcnow())
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await db.execute(delete(model).where(model.id.in_(expired_ids)))
+        await db.commit()
+        removed += result.rowcount
+        if result.rowcount < batch_size:
+            return removed
+
+async def purge_expired_verification_tokens(db: AsyncSession, batch_size: int = 10000) -> int:
+    """Delete expired verification tokens in batches; returns how many were removed"""
+    return await _purge_expired(db, VerificationToken, batch_size)
+
+def issue_refresh_token(db: AsyncSession, user_id: int, family_id: Optional[str] = None) -> str:
+    """Stage a new refresh token (a new family unless rotating); returns the raw token"""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        family_id=family_id or secrets.token_hex(16),
+        token_hash=hash_token(token),
+        expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days),
+    ))
+    return token
+
+async def revoke_refresh_family(db: AsyncSession, family_id: str):
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Optional[Tuple[int, str]]:
+    """Swap a refresh token for its successor; returns (user_id, new_token) or None.
+
+    Presenting a token that was already rotated means it leaked (or a client
+    raced itself), so the whole family is revoked. The caller commits.
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(RefreshToken, (RefreshToken.expires_at > now).label("live"))
+        .where(RefreshToken.token_hash == hash_token(token))
+        .with_for_update()
+    )
+    row = result.first()
+    if row is None:
+        return None
+    current, live = row
+    if current.revoked_at is not None or not live:
+        return None
+    if current.used_at is not None:
+        await revoke_refresh_family(db, current.family_id)
+        return None
+    current.used_at = now
+    return current.user_id, issue_refresh_token(db, current.user_id, current.family_id)
+
+async def revoke_refresh_token(db: AsyncSession, token: str):
+    """Revoke the family of a refresh token (logout); unknown tokens are ignored"""
+    result = await db.execute(select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_token(token)))
+    family_id = result.scalar()
+    if family_id is not None:
+        await revoke_refresh_family(db, family_id)
+
+async def purge_expired_refresh_tokens(db: AsyncSession, batch_size: int = 10000) -> int:
+    """Delete expired refresh tokens in batches; returns how many were removed"""
+    return await _purge_expired(db, RefreshToken, batch_size)
@@ -0,0 +1,24 @@
+# app/cache/__init__.py
+from .base import CacheBackend, Subscription
+from .memory import MemoryBackend
+from .redis import RedisBackend
+from .resp import RedisError
+from ..config import settings
+
+# Errors a backend call can raise when the shared store is unreachable or unhappy
+BACKEND_ERRORS = (OSError, RedisError)
+
+def create_cache_backend(url: str) -> CacheBackend:
+    """Build a backend from a ``memory://`` or ``redis://`` URL"""
+    if url.startswith("memory://"):
+        return MemoryBackend()
+    if url.startswith("redis://"):
+        return RedisBackend(url, pool_size=settings.cache_pool_size)
+    raise ValueError(f"Unsupported CACHE_URL: {url!r}")
+
+cache_backend = create_cache_backend(settings.cache_url)
+
+__all__ = [
+    "CacheBackend", "Subscription", "MemoryBackend", "RedisBackend", "RedisError",
+    "BACKEND_ERRORS", "create_cache_backend", "cache_backend",
+]
@@ -0,0 +1,70 @@
+# app/cache/base.py
+from abc import ABC, abstractmethod
+from typing import Dict, List, Mapping, Optional
+
+class Subscription(ABC):
+    """Active channel subscription; iterate it for messages, close() when done"""
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        return await self.get_message()
+
+    @abstractmethod
+    async def get_message(self) -> str:
+        ...
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+class CacheBackend(ABC):
+    """Minimal async key/value + pub/sub interface shared by the auth modules.
+
+    Values are strings; ``ttl`` is in seconds and ``None`` means no expiry.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> int:
+        ...
+
+    @abstractmethod
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        ...
+
+    @abstractmethod
+    async def mset(self, mapping: Mapping[str, str], ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Atomically add ``amount`` to an integer value (missing = 0); ``ttl`` resets the expiry"""
+
+    @abstractmethod
+    async def keys(self, prefix: str) -> List[str]:
+        """All live keys starting with ``prefix`` (for bootstrap/sync jobs, not hot paths)"""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> int:
+        ...
+
+    @abstractmethod
+    async def subscribe(self, channel: str) -> Subscription:
+        """Subscribe to ``channel``; messages published after this returns are delivered"""
+
+    async def close(self):
+        pass
+
+    async def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """mget() as a dict of the keys that were found"""
+        values = await self.mget(keys)
+        return {key: value for key, value in zip(keys, values) if value is not None}
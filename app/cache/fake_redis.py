@@ -0,0 +1,165 @@
+# app/cache/fake_redis.py
+"""In-process server speaking enough of the Redis protocol for tests and local dev.
+
+    python -m app.cache.fake_redis --port 6379
+"""
+import argparse
+import asyncio
+import fnmatch
+import time
+from typing import Dict, Optional, Set, Tuple
+from .resp import RedisError, SIMPLE_OK, encode_reply, read_reply
+
+class FakeRedisServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, clock=time.monotonic):
+        self.host = host
+        self.port = port
+        self.clock = clock
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def start(self) -> "FakeRedisServer":
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writers in self._channels.values():
+                for writer in writers:
+                    writer.close()
+            self._channels.clear()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def _get_live(self, key: bytes) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self.clock():
+            del self._data[key]
+            return None
+        return value
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscribed: Set[bytes] = set()
+        try:
+            while True:
+                try:
+                    command = await read_reply(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                if not isinstance(command, list) or not command:
+                    writer.write(encode_reply(RedisError("ERR protocol error")))
+                    continue
+                name, args = command[0].upper(), command[1:]
+                if name == b"SUBSCRIBE":
+                    for channel in args:
+                        self._channels.setdefault(channel, set()).add(writer)
+                        subscribed.add(channel)
+                        writer.write(encode_reply([b"subscribe", channel, len(subscribed)]))
+                else:
+                    writer.write(self._dispatch(name, args))
+                await writer.drain()
+        finally:
+            for channel in subscribed:
+                self._channels.get(channel, set()).discard(writer)
+            writer.close()
+
+    def _dispatch(self, name: bytes, args: list) -> bytes:
+        handler = getattr(self, "_cmd_" + name.decode().lower(), None)
+        if handler is None:
+            return encode_reply(RedisError(f"ERR unknown command '{name.decode()}'"))
+        try:
+            return handler(*args)
+        except (TypeError, ValueError):
+            return encode_reply(RedisError(f"ERR wrong arguments for '{name.decode()}'"))
+
+    def _cmd_ping(self, *args) -> bytes:
+        return b"+PONG\r\n"
+
+    def _cmd_select(self, db) -> bytes:
+        return SIMPLE_OK
+
+    def _cmd_auth(self, *args) -> bytes:
+        return SIMPLE_OK
+
+    def _cmd_get(self, key) -> bytes:
+        return encode_reply(self._get_live(key))
+
+    def _cmd_set(self, key, value, *options) -> bytes:
+        expires_at = None
+        options = [option.upper() if i % 2 == 0 else option for i, option in enumerate(options)]
+        if b"PX" in options:
+            expires_at = self.clock() + int(options[options.index(b"PX") + 1]) / 1000
+        elif b"EX" in options:
+            expires_at = self.clock() + int(options[options.index(b"EX") + 1])
+        if b"NX" in options and self._get_live(key) is not None:
+            return encode_reply(None)
+        self._data[key] = (value, expires_at)
+        return SIMPLE_OK
+
+    def _cmd_del(self, *keys) -> bytes:
+        return encode_reply(sum(self._data.pop(key, None) is not None for key in keys))
+
+    def _cmd_incrby(self, key, amount) -> bytes:
+        value = self._get_live(key)
+        expires_at = self._data[key][1] if value is not None else None
+        result = int(value or 0) + int(amount)
+        self._data[key] = (str(result).encode(), expires_at)
+        return encode_reply(result)
+
+    def _cmd_pexpire(self, key, milliseconds) -> bytes:
+        value = self._get_live(key)
+        if value is None:
+            return encode_reply(0)
+        self._data[key] = (value, self.clock() + int(milliseconds) / 1000)
+        return encode_reply(1)
+
+    def _cmd_mget(self, *keys) -> bytes:
+        return encode_reply([self._get_live(key) for key in keys])
+
+    def _cmd_scan(self, cursor, *options) -> bytes:
+        # Single pass: every match is returned with cursor 0
+        options = list(options)
+        pattern = b"*"
+        if b"MATCH" in [option.upper() for option in options]:
+            pattern = options[[option.upper() for option in options].index(b"MATCH") + 1]
+        keys = [key for key in list(self._data) if self._get_live(key) is not None and fnmatch.fnmatchcase(key, pattern)]
+        return encode_reply([b"0", keys])
+
+    def _cmd_publish(self, channel, message) -> bytes:
+        writers = self._channels.get(channel, set())
+        payload = encode_reply([b"message", channel, message])
+        for writer in writers:
+            writer.write(payload)
+        return encode_reply(len(writers))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Redis-protocol server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    async def serve():
+        server = await FakeRedisServer(args.host, args.port).start()
+        print(f"🧪 Fake Redis listening on {server.url}")
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+if __name__ == "__main__":
+    main()
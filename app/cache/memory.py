@@ -0,0 +1,74 @@
+# app/cache/memory.py
+import asyncio
+import time
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+from .base import CacheBackend, Subscription
+
+class MemorySubscription(Subscription):
+    def __init__(self, subscribers: Set[asyncio.Queue]):
+        self._subscribers = subscribers
+        self._queue: asyncio.Queue = asyncio.Queue()
+        subscribers.add(self._queue)
+
+    async def get_message(self) -> str:
+        return await self._queue.get()
+
+    async def close(self):
+        self._subscribers.discard(self._queue)
+
+class MemoryBackend(CacheBackend):
+    """Process-local backend; pub/sub only reaches subscribers in this process"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._data: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def _get_live(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self.clock():
+            del self._data[key]
+            return None
+        return value
+
+    def _expiry(self, ttl: Optional[float]) -> Optional[float]:
+        return self.clock() + ttl if ttl is not None else None
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._get_live(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        self._data[key] = (value, self._expiry(ttl))
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return [self._get_live(key) for key in keys]
+
+    async def mset(self, mapping: Mapping[str, str], ttl: Optional[float] = None):
+        expires_at = self._expiry(ttl)
+        for key, value in mapping.items():
+            self._data[key] = (value, expires_at)
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        entry = self._data.get(key)
+        value = int(self._get_live(key) or 0) + amount
+        expires_at = self._expiry(ttl) if ttl is not None else (entry[1] if entry else None)
+        self._data[key] = (str(value), expires_at)
+        return value
+
+    async def keys(self, prefix: str) -> List[str]:
+        return [key for key in list(self._data) if key.startswith(prefix) and self._get_live(key) is not None]
+
+    async def publish(self, channel: str, message: str) -> int:
+        queues = self._subscribers.get(channel, ())
+        for queue in queues:
+            queue.put_nowait(message)
+        return len(queues)
+
+    async def subscribe(self, channel: str) -> MemorySubscription:
+        return MemorySubscription(self._subscribers.setdefault(channel, set()))
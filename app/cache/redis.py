@@ -0,0 +1,170 @@
+# app/cache/redis.py
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+from .base import CacheBackend, Subscription
+from .resp import RedisError, encode_command, read_reply
+
+def _decode(value) -> Optional[str]:
+    return value.decode() if isinstance(value, bytes) else value
+
+def _ttl_args(ttl: Optional[float]) -> Tuple:
+    return ("PX", max(1, int(ttl * 1000))) if ttl is not None else ()
+
+class RedisConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host: str, port: int, db: int = 0, password: Optional[str] = None) -> "RedisConnection":
+        reader, writer = await asyncio.open_connection(host, port)
+        conn = cls(reader, writer)
+        setup = []
+        if password:
+            setup.append(("AUTH", password))
+        if db:
+            setup.append(("SELECT", db))
+        if setup:
+            await conn.pipeline(setup)
+        return conn
+
+    async def execute(self, *args):
+        return (await self.pipeline([args]))[0]
+
+    async def pipeline(self, commands: Sequence[Sequence]) -> list:
+        """Write all commands in one go, then read the replies in order"""
+        self.writer.write(b"".join(encode_command(*command) for command in commands))
+        await self.writer.drain()
+        replies = [await read_reply(self.reader) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+class RedisSubscription(Subscription):
+    def __init__(self, conn: RedisConnection, channel: str):
+        self.conn = conn
+        self.channel = channel
+
+    async def get_message(self) -> str:
+        while True:
+            reply = await read_reply(self.conn.reader)
+            if isinstance(reply, list) and reply and reply[0] == b"message":
+                return _decode(reply[2])
+
+    async def close(self):
+        await self.conn.close()
+
+class RedisBackend(CacheBackend):
+    """Backend for any server speaking the Redis protocol (Redis, Valkey, KeyDB...)
+
+    Connections are pooled per event loop; ``mset`` pipelines one ``SET ... PX``
+    per key so a TTL can be applied in a single round trip.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", pool_size: int = 10):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.pool_size = pool_size
+        self._loop = None
+        self._idle: List[RedisConnection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Connections belong to the loop that opened them
+            self._loop = loop
+            self._idle = []
+            self._slots = asyncio.Semaphore(self.pool_size)
+
+    async def _connect(self) -> RedisConnection:
+        return await RedisConnection.open(self.host, self.port, self.db, self.password)
+
+    @asynccontextmanager
+    async def connection(self):
+        self._bind_loop()
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                yield conn
+            except RedisError:
+                # Error replies are fully read; the connection is still in sync
+                self._idle.append(conn)
+                raise
+            except BaseException:
+                # The connection may hold unread replies; don't reuse it
+                await conn.close()
+                raise
+            else:
+                self._idle.append(conn)
+
+    async def execute(self, *args):
+        async with self.connection() as conn:
+            return await conn.execute(*args)
+
+    async def pipeline(self, commands: Sequence[Sequence]) -> list:
+        async with self.connection() as conn:
+            return await conn.pipeline(commands)
+
+    async def get(self, key: str) -> Optional[str]:
+        return _decode(await self.execute("GET", key))
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        await self.execute("SET", key, value, *_ttl_args(ttl))
+
+    async def delete(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        return await self.execute("DEL", *keys)
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        return [_decode(value) for value in await self.execute("MGET", *keys)]
+
+    async def mset(self, mapping: Mapping[str, str], ttl: Optional[float] = None):
+        if not mapping:
+            return
+        ttl_args = _ttl_args(ttl)
+        await self.pipeline([("SET", key, value, *ttl_args) for key, value in mapping.items()])
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        if ttl is None:
+            return await self.execute("INCRBY", key, amount)
+        value, _ = await self.pipeline([("INCRBY", key, amount), ("PEXPIRE", key, _ttl_args(ttl)[1])])
+        return value
+
+    async def keys(self, prefix: str) -> List[str]:
+        found, cursor = [], b"0"
+        while True:
+            cursor, batch = await self.execute("SCAN", cursor, "MATCH", prefix + "*", "COUNT", 1000)
+            found.extend(_decode(key) for key in batch)
+            if cursor in (b"0", 0):
+                return found
+
+    async def publish(self, channel: str, message: str) -> int:
+        return await self.execute("PUBLISH", channel, message)
+
+    async def subscribe(self, channel: str) -> RedisSubscription:
+        # Subscribed connections can't run other commands, so use a dedicated one
+        conn = await self._connect()
+        await conn.execute("SUBSCRIBE", channel)
+        return RedisSubscription(conn, channel)
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await conn.close()
@@ -0,0 +1,62 @@
+# app/cache/resp.py
+"""RESP2 wire encoding shared by the Redis client and the fake server"""
+import asyncio
+from typing import Union
+
+class RedisError(Exception):
+    """Error reply (``-ERR ...``) from a Redis-protocol server"""
+
+def encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+def encode_reply(value: Union[None, int, str, bytes, list, RedisError]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RedisError):
+        return b"-%s\r\n" % str(value).encode()
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode_reply(item) for item in value)
+    if isinstance(value, str):
+        value = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+SIMPLE_OK = b"+OK\r\n"
+
+async def read_reply(reader: asyncio.StreamReader):
+    """Read one RESP value; error replies are returned as RedisError instances"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode()
+    if prefix == b"-":
+        return RedisError(payload.decode())
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length == -1:
+            return None
+        try:
+            data = await reader.readexactly(length + 2)
+        except asyncio.IncompleteReadError as exc:
+            raise ConnectionError("Connection closed by server") from exc
+        return data[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length == -1:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected RESP prefix: {prefix!r}")
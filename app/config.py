@@ -11,17 +11,109 @@ except ImportError:
 class Settings(BaseSettings):
     # Database
     database_url: str = os.getenv("DATABASE_URL", "postgresql+psycopg://postgres@localhost:5432/auth_db")
+    # Compare the database's Alembic revision with the code's in the background at start-up
+    schema_check: bool = os.getenv("SCHEMA_CHECK", "true").lower() == "true"
+    # Use AsyncEngine/AsyncSession for request handling (psycopg async / aiosqlite)
+    database_async: bool = os.getenv("DATABASE_ASYNC", "false").lower() == "true"
+    # Defaults to DATABASE_URL with the async driver swapped in
+    async_database_url: str = os.getenv("ASYNC_DATABASE_URL", "")
+    # Connection pool per engine and worker: pool_size kept open, max_overflow extra under load
+    database_pool_size: int = int(os.getenv("DATABASE_POOL_SIZE", "5"))
+    database_max_overflow: int = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+    database_pool_timeout: float = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+    # Replace connections older than this (seconds, -1 = never) and test them before use, so failovers don't leave stale ones
+    database_pool_recycle: int = int(os.getenv("DATABASE_POOL_RECYCLE", "1800"))
+    database_pool_pre_ping: bool = os.getenv("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+    # Behind PgBouncer in transaction mode: no server-side prepared statements
+    database_pgbouncer: bool = os.getenv("DATABASE_PGBOUNCER", "false").lower() == "true"
+    # Read replicas (comma-separated sync URLs) for read-only lookups; empty sends everything to the primary
+    database_replica_urls: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    # Skip a replica this long after a connection failure on it
+    database_replica_retry_seconds: float = float(os.getenv("DATABASE_REPLICA_RETRY_SECONDS", "30"))
+    # Reads for a user written this recently go to the primary (covers replication lag)
+    database_read_your_writes_seconds: float = float(os.getenv("DATABASE_READ_YOUR_WRITES_SECONDS", "5"))
     
     # JWT
     secret_key: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     algorithm: str = os.getenv("ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Asymmetric signing: directory of <kid>.pem keys (empty = HMAC with SECRET_KEY/ALGORITHM)
+    jwt_keys_dir: str = os.getenv("JWT_KEYS_DIR", "")
+    jwt_active_kid: str = os.getenv("JWT_ACTIVE_KID", "")
+    jwks_max_age_seconds: int = int(os.getenv("JWKS_MAX_AGE_SECONDS", "300"))
+    # Verified-token memo (0 disables); entries are dropped this long before exp
+    token_memo_size: int = int(os.getenv("TOKEN_MEMO_SIZE", "10000"))
+    token_memo_skew_seconds: float = float(os.getenv("TOKEN_MEMO_SKEW_SECONDS", "5"))
+    refresh_token_expire_days: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+    # Embed principal claims in access tokens so protected routes skip the user query
+    jwt_stateless_auth: bool = os.getenv("JWT_STATELESS_AUTH", "false").lower() == "true"
     
     # Email settings (ADD THESE)
     email_user: str = os.getenv("EMAIL_USER", "")
     email_password: str = os.getenv("EMAIL_PASSWORD", "")
     frontend_url: str = os.getenv("FRONTEND_URL", "http://localhost:3000")
     
+    # Background email delivery
+    email_workers: int = int(os.getenv("EMAIL_WORKERS", "2"))
+    email_queue_size: int = int(os.getenv("EMAIL_QUEUE_SIZE", "10000"))
+    email_batch_size: int = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+    email_max_attempts: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    email_retry_backoff_seconds: float = float(os.getenv("EMAIL_RETRY_BACKOFF_SECONDS", "1"))
+    email_drain_timeout_seconds: float = float(os.getenv("EMAIL_DRAIN_TIMEOUT_SECONDS", "10"))
+    smtp_timeout_seconds: float = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+    
+    verification_token_ttl_hours: int = int(os.getenv("VERIFICATION_TOKEN_TTL_HOURS", "24"))
+    
+    # Email outbox dispatcher: "lifespan" runs it inside each API worker,
+    # "external" leaves it to `python -m app.outbox`
+    outbox_dispatcher: str = os.getenv("OUTBOX_DISPATCHER", "lifespan")
+    outbox_batch_size: int = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+    outbox_poll_interval_seconds: float = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "2"))
+    outbox_max_attempts: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+    outbox_retry_backoff_seconds: float = float(os.getenv("OUTBOX_RETRY_BACKOFF_SECONDS", "30"))
+    
+    # Admin endpoints (batch registration) require this key in X-Admin-Key; empty disables them
+    admin_api_key: str = os.getenv("ADMIN_API_KEY", "")
+    register_batch_max_size: int = int(os.getenv("REGISTER_BATCH_MAX_SIZE", "500"))
+    
+    # Password hashing policy; the first scheme hashes, the others are upgraded on login
+    password_schemes: str = os.getenv("PASSWORD_SCHEMES", "bcrypt")
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    argon2_memory_cost: int = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+    argon2_time_cost: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    argon2_parallelism: int = int(os.getenv("ARGON2_PARALLELISM", "4"))
+    
+    # Password hashing pool ("thread" or "process")
+    hashing_executor: str = os.getenv("HASHING_EXECUTOR", "thread")
+    hashing_workers: int = int(os.getenv("HASHING_WORKERS", str(os.cpu_count() or 1)))
+    hashing_queue_size: int = int(os.getenv("HASHING_QUEUE_SIZE", "64"))
+    
+    # Shared cache / pub-sub backend: memory:// (single process) or redis://host:port/db
+    cache_url: str = os.getenv("CACHE_URL", "memory://")
+    cache_pool_size: int = int(os.getenv("CACHE_POOL_SIZE", "10"))
+    
+    # In-process user lookup cache
+    user_cache_enabled: bool = os.getenv("USER_CACHE_ENABLED", "true").lower() == "true"
+    user_cache_size: int = int(os.getenv("USER_CACHE_SIZE", "30000"))
+    user_cache_ttl_seconds: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    # Also keep snapshots in the shared cache backend so workers can reuse each other's lookups
+    user_cache_shared: bool = os.getenv("USER_CACHE_SHARED", "false").lower() == "true"
+    
+    # Login throttling (0 disables a limit); counters live in the cache backend
+    login_ip_limit: int = int(os.getenv("LOGIN_IP_LIMIT", "30"))
+    login_ip_window_seconds: float = float(os.getenv("LOGIN_IP_WINDOW_SECONDS", "60"))
+    login_failure_limit: int = int(os.getenv("LOGIN_FAILURE_LIMIT", "5"))
+    login_failure_window_seconds: float = float(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", "900"))
+    login_lockout_base_seconds: float = float(os.getenv("LOGIN_LOCKOUT_BASE_SECONDS", "60"))
+    login_lockout_max_seconds: float = float(os.getenv("LOGIN_LOCKOUT_MAX_SECONDS", "3600"))
+    # Password verifications in flight per worker before logins get a fast 429
+    login_max_in_flight: int = int(os.getenv("LOGIN_MAX_IN_FLIGHT", str(2 * (os.cpu_count() or 1))))
+    
+    # Access-token revocation: per-worker Bloom filter in front of the cache backend
+    revocation_bloom_capacity: int = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+    revocation_bloom_error_rate: float = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+    revocation_sync_interval_seconds: float = float(os.getenv("REVOCATION_SYNC_INTERVAL_SECONDS", "300"))
+    
     class Config:
         env_file = ".env"
         extra = "ignore"
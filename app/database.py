@@ -1,16 +1,354 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional, Tuple, Type
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from fastapi import Depends
+from starlette.concurrency import run_in_threadpool
+from .cache import BACKEND_ERRORS, cache_backend
 from .config import settings
 
-engine = create_engine(settings.database_url)
+class PoolMetrics:
+    """Checkout wait time for one engine's pool; occupancy is read from the pool itself"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[Pool] = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> Dict[str, float]:
+        stats = {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds": self.wait_seconds,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+        if isinstance(self.pool, QueuePool):
+            stats.update({
+                "size": self.pool.size(),
+                "in_use": self.pool.checkedout(),
+                "idle": self.pool.checkedin(),
+                # Connections opened beyond pool_size (negative while the pool is still filling)
+                "overflow": max(0, self.pool.overflow()),
+            })
+        return stats
+
+class _TimedCheckout:
+    metrics: PoolMetrics
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # recreate() (engine.dispose()) builds a new pool of the same class
+        self.metrics.pool = self
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        # Includes opening a new connection when the pool has none idle
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+def instrumented_pool(pool_class: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    return type(f"Instrumented{pool_class.__name__}", (_TimedCheckout, pool_class), {"metrics": metrics})
+
+def engine_options(database_url: str, metrics: PoolMetrics, is_async: bool = False) -> dict:
+    """create_engine() keyword arguments for DATABASE_URL and the DATABASE_POOL_* settings"""
+    url = make_url(database_url)
+    connect_args = {}
+    if url.get_backend_name() == "sqlite":
+        if not is_async:
+            # Sync sessions hop between threadpool threads (see SyncSessionAdapter)
+            connect_args["check_same_thread"] = False
+        if url.database in (None, "", ":memory:"):
+            # In-memory SQLite keeps its own single-connection pool
+            return {"connect_args": connect_args}
+    elif settings.database_pgbouncer and url.get_driver_name() == "psycopg":
+        # Transaction pooling hands each transaction a different server connection,
+        # so statements prepared on one are missing on the next
+        connect_args["prepare_threshold"] = None
+    return {
+        "connect_args": connect_args,
+        "poolclass": instrumented_pool(AsyncAdaptedQueuePool if is_async else QueuePool, metrics),
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+
+pool_metrics = {"primary": PoolMetrics("primary")}
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, pool_metrics["primary"]))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Async drivers for the sync URLs we accept in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(database_url: str) -> str:
+    """Translate a sync database URL to its async driver equivalent"""
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.database_async:
+    async_database_url = settings.async_database_url or to_async_url(settings.database_url)
+    pool_metrics["primary_async"] = PoolMetrics("primary_async")
+    async_engine = create_async_engine(
+        async_database_url, **engine_options(async_database_url, pool_metrics["primary_async"], is_async=True)
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+class SyncSessionAdapter:
+    """Expose the AsyncSession API used by the routes on top of a sync Session.
+
+    Blocking calls are run in the threadpool, so the sync engine can back the
+    same ``await db.execute(select(...))`` code paths as the async engine.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.bind
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+def replica_urls() -> List[str]:
+    return [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()]
+
+def create_replica_session_factory(name: str, database_url: str) -> Callable:
+    """Session factory for one replica, matching the request path's session type"""
+    pool_metrics[name] = PoolMetrics(name)
+    if settings.database_async:
+        database_url = to_async_url(database_url)
+        replica_engine = create_async_engine(
+            database_url, **engine_options(database_url, pool_metrics[name], is_async=True)
+        )
+        return async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False)
+    replica_engine = create_engine(database_url, **engine_options(database_url, pool_metrics[name]))
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    return lambda: SyncSessionAdapter(factory())
+
+# A replica that cannot be reached or has no free connection; the read is retried on the primary
+REPLICA_ERRORS = (exc.OperationalError, exc.InterfaceError, exc.TimeoutError)
+
+class ReplicaRouter:
+    """Round-robin over healthy read replicas, plus read-your-writes pins for recently written users.
+
+    Pins live in the shared cache backend so a read on another worker also sees them.
+    """
+
+    PIN_PREFIX = "read_your_writes:"
+
+    def __init__(self, replicas: List[Tuple[str, Callable]]):
+        self.replicas = replicas
+        self._down_until: Dict[str, float] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def session(self) -> Tuple[Optional[str], Optional[object]]:
+        """(name, session) of the next healthy replica, or (None, None) to use the primary"""
+        now = time.monotonic()
+        with self._lock:
+            for offset in range(len(self.replicas)):
+                name, factory = self.replicas[(self._next + offset) % len(self.replicas)]
+                if self._down_until.get(name, 0.0) <= now:
+                    self._next = (self._next + offset + 1) % len(self.replicas)
+                    return name, factory()
+        return None, None
+
+    def mark_down(self, name: str):
+        with self._lock:
+            self._down_until[name] = time.monotonic() + settings.database_replica_retry_seconds
+
+    async def pin_user(self, user):
+        """Send reads for this user to the primary until the replicas have caught up"""
+        if not self.replicas or settings.database_read_your_writes_seconds <= 0:
+            return
+        keys = {f"{self.PIN_PREFIX}{field}:{getattr(user, field)}": "1" for field in ("id", "username", "email")}
+        try:
+            await cache_backend.mset(keys, ttl=settings.database_read_your_writes_seconds)
+        except BACKEND_ERRORS:
+            pass
+
+    async def user_pinned(self, field: str, value) -> bool:
+        if settings.database_read_your_writes_seconds <= 0:
+            return False
+        try:
+            return await cache_backend.get(f"{self.PIN_PREFIX}{field}:{value}") is not None
+        except BACKEND_ERRORS:
+            # Can't tell, so don't risk a stale read
+            return True
+
+    def stats(self) -> Dict[str, Dict[str, bool]]:
+        now = time.monotonic()
+        return {name: {"healthy": self._down_until.get(name, 0.0) <= now} for name, _ in self.replicas}
+
+class ReadSession:
+    """Read-only session that prefers a replica and falls back to the primary.
+
+    Only the read methods are exposed. A statement that fails on the replica
+    connection is retried on the primary, which is safe because nothing here writes.
+    """
+
+    def __init__(self, primary, replica=None, replica_name: Optional[str] = None):
+        self.primary = primary
+        self.replica = replica
+        self.replica_name = replica_name
+
+    @property
+    def on_replica(self) -> bool:
+        return self.replica is not None
+
+    async def prefer_primary_for(self, field: str, value):
+        """Read from the primary if this user was written within the read-your-writes window"""
+        if self.replica is not None and await replica_router.user_pinned(field, value):
+            await self.close()
+
+    async def _run(self, method: str, *args, **kwargs):
+        if self.replica is not None:
+            try:
+                return await getattr(self.replica, method)(*args, **kwargs)
+            except REPLICA_ERRORS:
+                replica_router.mark_down(self.replica_name)
+                await self.close()
+        return await getattr(self.primary, method)(*args, **kwargs)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await self._run("execute", statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await self._run("scalar", statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await self._run("scalars", statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await self._run("get", entity, ident, **kwargs)
+
+    async def close(self):
+        """Release the replica session; the primary belongs to its own dependency"""
+        replica, self.replica = self.replica, None
+        if replica is not None:
+            try:
+                await replica.close()
+            except REPLICA_ERRORS:
+                pass
+
+replica_router = ReplicaRouter([
+    (f"replica_{index}", create_replica_session_factory(f"replica_{index}", url))
+    for index, url in enumerate(replica_urls())
+])
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_sync_session(db: Session = Depends(get_db)):
+    yield SyncSessionAdapter(db)
+
+# Routes depend on get_session; in sync mode it still goes through get_db so
+# dependency_overrides[get_db] keeps working.
+get_session = get_async_db if settings.database_async else get_sync_session
+
+async def get_read_session(primary=Depends(get_session)):
+    """Session for read-only lookups: a healthy replica when configured, else the primary.
+
+    Depends on get_session so the primary (and its test overrides) stays the fallback;
+    it does not check out a connection unless a read falls back to it.
+    """
+    name, replica = replica_router.session()
+    db = ReadSession(primary, replica, name)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+@asynccontextmanager
+async def session_scope():
+    """Session for work outside a request (background tasks, dispatchers, CLIs)"""
+    if settings.database_async:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SyncSessionAdapter(SessionLocal(expire_on_commit=False))
+        try:
+            yield db
+        finally:
+            await db.close()
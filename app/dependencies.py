@@ -1,32 +1,77 @@
-from fastapi import Depends, HTTPException, status
+import secrets
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from .database import get_db
+from .config import settings
+from .database import ReadSession, get_read_session
 from .models import User
-from .auth import verify_token
+from .schemas import Principal, TokenData
+from .auth import verify_token, get_user_by_username, lookup_user
 
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    token_data = verify_token(credentials.credentials)
+
+async def get_token_data(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
+    token_data = await verify_token(credentials.credentials)
     if token_data is None:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.username == token_data.username).first()
+        raise _credentials_exception()
+    return token_data
+
+def principal_from_token(token_data: TokenData) -> Principal:
+    return Principal(
+        id=token_data.user_id,
+        email=token_data.email,
+        username=token_data.username,
+        is_active=token_data.is_active,
+        is_verified=token_data.is_verified,
+        created_at=token_data.created_at,
+        verified_at=token_data.verified_at,
+        token_version=token_data.token_version,
+    )
+
+async def get_current_user(
+    token_data: TokenData = Depends(get_token_data),
+    db: ReadSession = Depends(get_read_session)
+) -> User:
+    """Full ORM user; always hits the database (a replica unless recently written)"""
+    await db.prefer_primary_for("username", token_data.username)
+    user = await get_user_by_username(db, token_data.username)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
+async def get_current_principal(
+    token_data: TokenData = Depends(get_token_data),
+    db: ReadSession = Depends(get_read_session)
+) -> Principal:
+    """Authenticated principal, built from token claims when the token carries them"""
+    if settings.jwt_stateless_auth and token_data.user_id is not None:
+        return principal_from_token(token_data)
+    # Tokens minted before stateless mode was enabled fall back to a (cached) lookup
+    await db.prefer_primary_for("username", token_data.username)
+    user = await lookup_user(db, "username", token_data.username)
+    if user is None:
+        raise _credentials_exception()
+    return Principal.model_validate(user)
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_active_principal(current_user: Principal = Depends(get_current_principal)) -> Principal:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+async def require_admin_key(x_admin_key: str = Header(default="")):
+    """Guard for admin-console endpoints; disabled entirely while ADMIN_API_KEY is unset"""
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not secrets.compare_digest(x_admin_key.encode(), settings.admin_api_key.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin key")
@@ -0,0 +1,179 @@
+# app/email_queue.py
+import asyncio
+import smtplib
+import time
+from dataclasses import dataclass, field
+from email.message import Message
+from typing import Callable, List, Optional
+
+class EmailQueueFull(Exception):
+    """Raised when the outbound queue is at capacity"""
+
+@dataclass
+class OutboundEmail:
+    message: Message
+    on_failure: Optional[Callable[[], None]] = None
+    attempts: int = 0
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+def _is_permanent(exc: Exception) -> bool:
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    code = getattr(exc, "smtp_code", None)
+    return isinstance(code, int) and 500 <= code < 600
+
+class SMTPConnection:
+    """Authenticated SMTP session reused across messages by one worker"""
+
+    def __init__(self, connect: Callable[[], smtplib.SMTP], idle_timeout: float):
+        self._connect = connect
+        self.idle_timeout = idle_timeout
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _ensure(self) -> smtplib.SMTP:
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            # Servers drop idle sessions; check before sending into a dead socket
+            try:
+                self._smtp.noop()
+            except smtplib.SMTPException:
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def send_batch(self, batch: List[OutboundEmail]) -> List[Optional[Exception]]:
+        """Send each message in order; returns the error per message (None if sent)"""
+        results: List[Optional[Exception]] = []
+        for item in batch:
+            try:
+                try:
+                    self._ensure().send_message(item.message)
+                except smtplib.SMTPServerDisconnected:
+                    self.close()
+                    self._ensure().send_message(item.message)
+                results.append(None)
+            except (smtplib.SMTPException, OSError) as exc:
+                if not isinstance(exc, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                    # Protocol state is unknown; start the next message on a fresh session
+                    self.close()
+                results.append(exc)
+            self._last_used = time.monotonic()
+        return results
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+class EmailQueue:
+    """In-process outbound queue drained by async workers.
+
+    Each worker keeps its own authenticated SMTP session and sends up to
+    ``batch_size`` queued messages over it per round. Transient failures are
+    retried with exponential backoff; after ``max_attempts`` the message's
+    ``on_failure`` callback runs.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], smtplib.SMTP],
+        workers: int = 2,
+        maxsize: int = 10000,
+        batch_size: int = 20,
+        max_attempts: int = 5,
+        backoff_base: float = 1.0,
+        idle_timeout: float = 30.0,
+    ):
+        self.connect = connect
+        self.workers = workers
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.idle_timeout = idle_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: set = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Stop the workers, first waiting up to ``timeout`` seconds for the queue to drain"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for task in [*self._tasks, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks = []
+        self._retries = set()
+
+    async def _drain(self):
+        while True:
+            await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.gather(*self._retries, return_exceptions=True)
+
+    def enqueue(self, message: Message, on_failure: Optional[Callable[[], None]] = None) -> asyncio.Future:
+        """Queue a message; the returned future resolves to True once sent, False if it gave up"""
+        item = OutboundEmail(message, on_failure, future=asyncio.get_running_loop().create_future())
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            raise EmailQueueFull()
+        return item.future
+
+    async def _worker(self):
+        conn = SMTPConnection(self.connect, self.idle_timeout)
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                try:
+                    results = await asyncio.to_thread(conn.send_batch, batch)
+                    for item, error in zip(batch, results):
+                        self._finish(item, error)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            await asyncio.to_thread(conn.close)
+
+    def _finish(self, item: OutboundEmail, error: Optional[Exception]):
+        item.attempts += 1
+        if error is None:
+            item.future.set_result(True)
+            return
+        if _is_permanent(error) or item.attempts >= self.max_attempts:
+            print(f"❌ SMTP Error (giving up after {item.attempts} attempts): {error}")
+            if item.on_failure is not None:
+                item.on_failure()
+            item.future.set_result(False)
+            return
+        task = asyncio.create_task(self._retry(item))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _retry(self, item: OutboundEmail):
+        await asyncio.sleep(self.backoff_base * 2 ** (item.attempts - 1))
+        await self._queue.put(item)
@@ -1,85 +1,99 @@
+import asyncio
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv  
 import os
+from .config import settings
+from .email_queue import EmailQueue, EmailQueueFull
+from .email_templates import VERIFICATION, WELCOME, RenderedEmail
 
 load_dotenv()
 
+GMAIL_SMTP_SERVER = "smtp.gmail.com"
+
 class EmailService:
     def __init__(self):
-        self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 587
+        self.smtp_server = os.getenv("SMTP_HOST", GMAIL_SMTP_SERVER)
+        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
+        self.smtp_starttls = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
         
         self.email = os.getenv("EMAIL_USER")
         self.password = os.getenv("EMAIL_PASSWORD")
         self.frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
-                
-    def send_verification_email(self, to_email: str, username: str, verification_token: str):
-        """Send verification email via Gmail with proper error handling"""
-        verification_link = f"{self.frontend_url}?token={verification_token}"
         
-        subject = "🔐 Verify Your Email - Auth Service"
-        
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }}
-                .container {{ max-width: 600px; margin: 0 auto; background: white; border-radius: 15px; padding: 40px; box-shadow: 0 10px 30px rgba(0,0,0,0.1); }}
-                .header {{ text-align: center; margin-bottom: 30px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; border-radius: 10px; color: white; }}
-                .header h1 {{ margin: 0; font-size: 24px; }}
-                .content {{ line-height: 1.6; color: #333; }}
-                .verify-btn {{ display: inline-block; background: linear-gradient(135deg, #28a745 0%, #20c997 100%); color: white; padding: 15px 30px; text-decoration: none; border-radius: 8px; font-weight: bold; margin: 20px 0; }}
-                .link-box {{ background: #f8f9fa; padding: 20px; border-radius: 8px; border-left: 4px solid #667eea; margin: 20px 0; word-break: break-all; }}
-                .footer {{ margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; text-align: center; color: #666; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🔐 Verify Your Email</h1>
-                </div>
-                
-                <div class="content">
-                    <h2>Welcome, {username}! 👋</h2>
-                    
-                    <p>Thank you for registering! Please verify your email address to complete your registration.</p>
-                    
-                    <center>
-                        <a href="{verification_link}" class="verify-btn">✅ Verify My Email</a>
-                    </center>
-                    
-                    <p>Or copy and paste this link:</p>
-                    <div class="link-box">
-                        {verification_link}
-                    </div>
-                    
-                    <p><strong>This link expires in 24 hours.</strong></p>
-                </div>
+        # Background delivery; send_* fall back to sending inline until started
+        self.queue = EmailQueue(
+            connect=self._connect,
+            workers=settings.email_workers,
+            maxsize=settings.email_queue_size,
+            batch_size=settings.email_batch_size,
+            max_attempts=settings.email_max_attempts,
+            backoff_base=settings.email_retry_backoff_seconds,
+        )
                 
-                <div class="footer">
-                    <p>Auth Service - Secure Authentication</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
+    def verification_link(self, verification_token: str) -> str:
+        return f"{self.frontend_url}?token={verification_token}"
+    
+    def _credentials_configured(self) -> bool:
         if not self.email or not self.password:
             print("❌ Gmail credentials not configured")
             print(f"   EMAIL_USER: {self.email or 'NOT_SET'}")
             print(f"   EMAIL_PASSWORD: {'SET' if self.password else 'NOT_SET'}")
-            return self._console_fallback(to_email, username, verification_link)
-            
-        if len(self.password) != 19:  # 16 chars + 3 spaces
+            return False
+        if self.smtp_server == GMAIL_SMTP_SERVER and len(self.password) != 19:  # 16 chars + 3 spaces
             print(f"❌ Gmail App Password format incorrect (length: {len(self.password)})")
             print("💡 Should be 19 characters: 'abcd efgh ijkl mnop'")
+            return False
+        return True
+    
+    async def deliver(self, kind: str, to_email: str, payload: dict) -> bool:
+        """Deliver an outbox job; returns True once the message has been handed to SMTP"""
+        username = payload["username"]
+        if kind == "verification":
+            verification_link = self.verification_link(payload["token"])
+            rendered = VERIFICATION.render(username=username, verification_link=verification_link)
+        elif kind == "welcome":
+            verification_link = None
+            rendered = WELCOME.render(username=username, frontend_url=self.frontend_url)
+        else:
+            raise ValueError(f"Unknown email kind: {kind!r}")
+        
+        if not self._credentials_configured():
+            # Nothing can be delivered without credentials; keep the dev flow working
+            if verification_link is not None:
+                self._console_fallback(to_email, username, verification_link)
+            return True
+        
+        if self.queue.running:
+            try:
+                return await self.queue.enqueue(self._build_message(to_email, rendered))
+            except EmailQueueFull:
+                pass
+        return await asyncio.to_thread(self._send_gmail, to_email, rendered)
+    
+    def send_verification_email(self, to_email: str, username: str, verification_token: str):
+        """Send verification email via Gmail with proper error handling"""
+        verification_link = self.verification_link(verification_token)
+        
+        rendered = VERIFICATION.render(username=username, verification_link=verification_link)
+        
+        if not self._credentials_configured():
             return self._console_fallback(to_email, username, verification_link)
         
+        if self.queue.running:
+            try:
+                self.queue.enqueue(
+                    self._build_message(to_email, rendered),
+                    on_failure=lambda: self._console_fallback(to_email, username, verification_link),
+                )
+                print(f"📤 Verification email queued for {to_email}")
+                return True
+            except EmailQueueFull:
+                print(f"⚠️ Email queue full, sending inline to {to_email}")
+        
         try:
-            success = self._send_gmail(to_email, subject, html_body)
+            success = self._send_gmail(to_email, rendered)
             if success:
                 print(f"✅ Gmail email sent successfully to {to_email}")
                 print(f"🔗 Verification link: {verification_link}")
@@ -94,37 +108,54 @@ class EmailService:
     def send_welcome_email(self, to_email: str, username: str):
         """Send welcome email"""
         try:
-            html_body = f"""
-            <div style="font-family: Arial; max-width: 600px; margin: 0 auto; padding: 40px; background: white; border-radius: 15px;">
-                <h1 style="color: #28a745; text-align: center;">🎉 Welcome {username}!</h1>
-                <p>Your email has been verified successfully! You can now log in to your account.</p>
-                <div style="text-align: center; margin: 30px 0;">
-                    <a href="{self.frontend_url}" style="background: #667eea; color: white; padding: 15px 30px; text-decoration: none; border-radius: 8px;">Go to App</a>
-                </div>
-            </div>
-            """
+            rendered = WELCOME.render(username=username, frontend_url=self.frontend_url)
             
-            self._send_gmail(to_email, "🎉 Welcome! Account Verified", html_body)
+            if not self.email or not self.password:
+                print(f"📧 Welcome email skipped for {username} (credentials not configured)")
+                return True
+            if self.queue.running:
+                try:
+                    self.queue.enqueue(self._build_message(to_email, rendered))
+                    print(f"📤 Welcome email queued for {to_email}")
+                    return True
+                except EmailQueueFull:
+                    pass
+            self._send_gmail(to_email, rendered)
             print(f"✅ Welcome email sent to {to_email}")
         except:
             print(f"📧 Welcome email attempted for {username}")
         
         return True
     
-    def _send_gmail(self, to_email: str, subject: str, html_body: str):
-        """Send email via Gmail SMTP"""
+    def _build_message(self, to_email: str, rendered: RenderedEmail) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = rendered.subject_header
+        msg['From'] = self.email
+        msg['To'] = to_email
+        
+        # Clients show the last alternative they support, so HTML goes last
+        msg.attach(MIMEText(rendered.text, 'plain', 'utf-8'))
+        msg.attach(MIMEText(rendered.html, 'html', 'utf-8'))
+        return msg
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open an authenticated SMTP session"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=settings.smtp_timeout_seconds)
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.email
-            msg['To'] = to_email
-            
-            html_part = MIMEText(html_body, 'html')
-            msg.attach(html_part)
-            
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
+            if self.smtp_starttls:
+                server.starttls()
             server.login(self.email, self.password)
+        except BaseException:
+            server.close()
+            raise
+        return server
+    
+    def _send_gmail(self, to_email: str, rendered: RenderedEmail):
+        """Send email via Gmail SMTP on a one-off connection"""
+        try:
+            msg = self._build_message(to_email, rendered)
+            
+            server = self._connect()
             server.send_message(msg)
             server.quit()
             
@@ -0,0 +1,64 @@
+# app/hashing.py
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+from .config import settings
+
+T = TypeVar("T")
+
+class HashingPoolSaturated(Exception):
+    """Raised when the hashing pool has no free worker or queue slot"""
+
+class HashingPool:
+    """Bounded executor for CPU-heavy password hashing work.
+
+    At most ``workers + queue_size`` jobs are admitted at once; anything beyond
+    that is rejected immediately with ``HashingPoolSaturated`` instead of piling
+    up behind the event loop.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4, queue_size: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing executor kind: {kind!r}")
+        self.kind = kind
+        self.workers = workers
+        self.queue_size = queue_size
+        self.capacity = workers + queue_size
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="hashing"
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Run ``fn(*args)`` on the pool, rejecting the call if the pool is full"""
+        if self._in_flight >= self.capacity:
+            raise HashingPoolSaturated()
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+hashing_pool = HashingPool(
+    kind=settings.hashing_executor,
+    workers=settings.hashing_workers,
+    queue_size=settings.hashing_queue_size,
+)
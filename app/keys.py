@@ -0,0 +1,156 @@
+# app/keys.py
+"""JWT signing key ring.
+
+With ``JWT_KEYS_DIR`` set, every ``<kid>.pem`` in that directory is loaded
+once at startup: private keys (RSA -> RS256, EC P-256 -> ES256) can sign,
+public-only PEMs are kept to verify tokens from retired keys. The active
+key (``JWT_ACTIVE_KID``, default: the last kid in sort order) signs new
+tokens and every key is published at ``/.well-known/jwks.json``.
+
+Without it, tokens are signed with ``SECRET_KEY`` and ``ALGORITHM`` (HMAC)
+and the published key set is empty.
+
+    python -m app.keys generate --dir keys --algorithm RS256
+"""
+import argparse
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from .config import settings
+
+ALGORITHMS = ("RS256", "ES256")
+
+def _algorithm_for(key) -> str:
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)) and key.curve.name == "secp256r1":
+        return "ES256"
+    raise ValueError(f"Unsupported key type {type(key).__name__}")
+
+class KeyRing:
+    def __init__(self, active_kid: Optional[str] = None):
+        self.active_kid = active_kid
+        # Parsed key objects by kid; PEMs are never re-parsed per token
+        self._keys: Dict[Optional[str], Key] = {}
+        self._public: Dict[str, Key] = {}
+        self._algorithms: Dict[Optional[str], str] = {}
+        self._can_sign: Dict[Optional[str], bool] = {}
+        self._jwks_body: Optional[bytes] = None
+
+    @classmethod
+    def symmetric(cls, secret: str, algorithm: str) -> "KeyRing":
+        ring = cls(active_kid=None)
+        ring._keys[None] = jwk.construct(secret, algorithm)
+        ring._algorithms[None] = algorithm
+        ring._can_sign[None] = True
+        return ring
+
+    @classmethod
+    def from_directory(cls, directory: str, active_kid: Optional[str] = None) -> "KeyRing":
+        ring = cls()
+        for path in sorted(Path(directory).glob("*.pem")):
+            ring.add(path.stem, path.read_bytes())
+        if not ring._keys:
+            raise ValueError(f"No *.pem keys found in {directory}")
+        signing_kids = [kid for kid, can_sign in ring._can_sign.items() if can_sign]
+        ring.active_kid = active_kid or (signing_kids[-1] if signing_kids else None)
+        if not ring._can_sign.get(ring.active_kid):
+            raise ValueError(f"Active key {ring.active_kid!r} has no private key in {directory}")
+        return ring
+
+    def add(self, kid: str, pem: bytes):
+        """Add a PEM key; private keys can sign, public keys only verify"""
+        can_sign = b"PRIVATE KEY" in pem
+        if can_sign:
+            algorithm = _algorithm_for(serialization.load_pem_private_key(pem, password=None))
+        else:
+            algorithm = _algorithm_for(serialization.load_pem_public_key(pem))
+        parsed = jwk.construct(pem, algorithm)
+        self._keys[kid] = parsed
+        self._algorithms[kid] = algorithm
+        self._public[kid] = parsed.public_key() if can_sign else parsed
+        self._can_sign[kid] = can_sign
+        self._jwks_body = None
+
+    @property
+    def algorithm(self) -> str:
+        return self._algorithms[self.active_kid]
+
+    def sign(self, claims: dict) -> str:
+        headers = {"kid": self.active_kid} if self.active_kid is not None else None
+        return jwt.encode(claims, self._keys[self.active_kid], algorithm=self.algorithm, headers=headers)
+
+    def decode(self, token: str) -> dict:
+        """Verify and decode ``token``; raises JWTError for unknown kids or bad signatures"""
+        kid = jwt.get_unverified_header(token).get("kid", self.active_kid)
+        key = self._public.get(kid) or self._keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown signing key {kid!r}")
+        return jwt.decode(token, key, algorithms=[self._algorithms[kid]])
+
+    def jwks(self) -> dict:
+        keys = []
+        for kid, key in self._public.items():
+            entry = key.to_dict()
+            entry.update({"kid": kid, "use": "sig"})
+            keys.append(entry)
+        return {"keys": keys}
+
+    def jwks_body(self) -> bytes:
+        """Serialized JWKS, built once per key change"""
+        if self._jwks_body is None:
+            self._jwks_body = json.dumps(self.jwks(), sort_keys=True, separators=(",", ":")).encode()
+        return self._jwks_body
+
+    def jwks_etag(self) -> str:
+        return '"' + hashlib.sha256(self.jwks_body()).hexdigest()[:32] + '"'
+
+def load_key_ring() -> KeyRing:
+    if settings.jwt_keys_dir:
+        return KeyRing.from_directory(settings.jwt_keys_dir, settings.jwt_active_kid or None)
+    return KeyRing.symmetric(settings.secret_key, settings.algorithm)
+
+_key_ring: Optional[KeyRing] = None
+
+def get_key_ring() -> KeyRing:
+    """Process-wide key ring, loaded on first use (so the CLI works before any key exists)"""
+    global _key_ring
+    if _key_ring is None:
+        _key_ring = load_key_ring()
+    return _key_ring
+
+def generate_key(algorithm: str):
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    raise ValueError(f"Unsupported algorithm {algorithm}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage JWT signing keys")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate = subparsers.add_parser("generate", help="Write a new private key as <kid>.pem")
+    generate.add_argument("--dir", default="keys")
+    generate.add_argument("--algorithm", choices=ALGORITHMS, default="RS256")
+    generate.add_argument("--kid", help="Defaults to a timestamp, so newer keys sort last")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        kid = args.kid or datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        directory = Path(args.dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{kid}.pem"
+        path.write_bytes(generate_key(args.algorithm).private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+        path.chmod(0o600)
+        print(f"🔑 Wrote {args.algorithm} key {kid} to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,73 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import auth
-from .database import Base, engine
+from fastapi.responses import JSONResponse
+from .routers import auth, jwks
+from .database import engine, pool_metrics, replica_router
+from .hashing import hashing_pool, HashingPoolSaturated
+from .rate_limit import LoginThrottled
+from .cache import cache_backend
+from .keys import get_key_ring
+from .auth import drain_rehashes
+from .user_cache import listen_for_invalidations
+from .revocation import revocation_list
+from .email_service import email_service
+from .outbox import outbox_dispatcher
+from .config import settings
+from .migrations import check_schema
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_key_ring()  # Fail fast on a bad JWT_KEYS_DIR
+    # Schema changes are applied by `python migrate_db.py`; only compare revisions, off the start-up path
+    schema_check = asyncio.create_task(check_schema(engine)) if settings.schema_check else None
+    invalidation_listener = asyncio.create_task(listen_for_invalidations())
+    revocation_follower = asyncio.create_task(revocation_list.run())
+    await email_service.queue.start()
+    dispatcher = None
+    if settings.outbox_dispatcher == "lifespan":
+        dispatcher = asyncio.create_task(outbox_dispatcher.run_forever())
+    yield
+    if schema_check is not None:
+        schema_check.cancel()
+    if dispatcher is not None:
+        dispatcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await dispatcher
+    await email_service.queue.stop(timeout=settings.email_drain_timeout_seconds)
+    for task in (invalidation_listener, revocation_follower):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await drain_rehashes()
+    await cache_backend.close()
+    # Let in-flight hashes finish before the worker exits
+    hashing_pool.shutdown(wait=True)
 
 app = FastAPI(
     title="Authorization Service",
     description="A simple FastAPI authorization service with JWT authentication",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.exception_handler(HashingPoolSaturated)
+async def hashing_pool_saturated_handler(request: Request, exc: HashingPoolSaturated):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(LoginThrottled)
+async def login_throttled_handler(request: Request, exc: LoginThrottled):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 # CORS middleware - Allow frontend to connect
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +87,7 @@ app.add_middleware(
 
 # Include routers
 app.include_router(auth.router)
+app.include_router(jwks.router)
 
 @app.get("/")
 async def root():
@@ -38,4 +95,8 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {
+        "status": "healthy",
+        "database_pool": {name: metrics.stats() for name, metrics in pool_metrics.items()},
+        "database_replicas": replica_router.stats(),
+    }
\ No newline at end of file
@@ -0,0 +1,44 @@
+# app/maintenance.py
+"""Periodic cleanup jobs; run from cron or a scheduled container.
+
+    python -m app.maintenance purge-verification-tokens
+    python -m app.maintenance purge-refresh-tokens
+    python -m app.maintenance unlock-user USERNAME
+"""
+import argparse
+import asyncio
+from .auth import purge_expired_refresh_tokens, purge_expired_verification_tokens
+from .database import session_scope
+from .rate_limit import login_throttle
+
+async def purge_verification_tokens(batch_size: int) -> int:
+    async with session_scope() as db:
+        return await purge_expired_verification_tokens(db, batch_size=batch_size)
+
+async def purge_refresh_tokens(batch_size: int) -> int:
+    async with session_scope() as db:
+        return await purge_expired_refresh_tokens(db, batch_size=batch_size)
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth service maintenance jobs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    purge = subparsers.add_parser("purge-verification-tokens", help="Delete expired email verification tokens")
+    purge.add_argument("--batch-size", type=int, default=10000)
+    purge_refresh = subparsers.add_parser("purge-refresh-tokens", help="Delete expired refresh tokens")
+    purge_refresh.add_argument("--batch-size", type=int, default=10000)
+    unlock = subparsers.add_parser("unlock-user", help="Clear a username's login failures and lockout")
+    unlock.add_argument("username")
+    args = parser.parse_args()
+
+    if args.command == "purge-verification-tokens":
+        removed = asyncio.run(purge_verification_tokens(args.batch_size))
+        print(f"🧹 Removed {removed} expired verification tokens")
+    elif args.command == "purge-refresh-tokens":
+        removed = asyncio.run(purge_refresh_tokens(args.batch_size))
+        print(f"🧹 Removed {removed} expired refresh tokens")
+    elif args.command == "unlock-user":
+        asyncio.run(login_throttle.unlock(args.username))
+        print(f"🔓 Unlocked {args.username}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# app/migrations.py
+"""Schema migration helpers shared by the Alembic revisions and the app.
+
+Schema changes run out of band (``python migrate_db.py`` or ``alembic upgrade
+head``), never during worker start-up; workers only compare revisions in the
+background and warn when they are out of step.
+"""
+import asyncio
+from pathlib import Path
+from typing import List, Optional
+import sqlalchemy as sa
+from alembic import op
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def alembic_config(database_url: Optional[str] = None) -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    if database_url:
+        config.set_main_option("sqlalchemy.url", database_url)
+    return config
+
+def head_revision() -> Optional[str]:
+    """Latest revision in alembic/versions; reads files only, no database access"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_revision(engine: sa.engine.Engine) -> Optional[str]:
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+def inspector() -> Optional[sa.Inspector]:
+    """Inspector for the migration connection, or None when emitting SQL offline"""
+    return None if op.get_context().as_sql else sa.inspect(op.get_bind())
+
+def create_index_concurrently(name: str, table: str, columns: List[str], **kw):
+    """Add an index without blocking writes: CONCURRENTLY (outside the transaction) on Postgres"""
+    existing = inspector()
+    if existing is not None and name in {index["name"] for index in existing.get_indexes(table)}:
+        return
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kw)
+    else:
+        op.create_index(name, table, columns, **kw)
+
+async def check_schema(engine: sa.engine.Engine):
+    """Warn (never fail) if the database is behind the code; meant to run as a background task"""
+    try:
+        expected = head_revision()
+        current = await asyncio.to_thread(current_revision, engine)
+    except Exception as e:
+        print(f"⚠️ Schema check skipped, database not reachable yet: {e}")
+        return
+    if current != expected:
+        print(f"⚠️ Database schema is at {current or 'no revision'}, code expects {expected}; run `python migrate_db.py`")
@@ -1,5 +1,6 @@
 # app/models.py
-from sqlalchemy import Boolean, Column, Integer, String, DateTime
+from datetime import datetime
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, JSON, Index, ForeignKey
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -12,7 +13,55 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)  # Email verification status
-    verification_token = Column(String, nullable=True)  # Verification token
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)  # Bump to invalidate claims in issued tokens
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    verified_at = Column(DateTime(timezone=True), nullable=True)  # When email was verified
\ No newline at end of file
+    verified_at = Column(DateTime(timezone=True), nullable=True)  # When email was verified
+
+class VerificationToken(Base):
+    """Email verification token; only its SHA-256 digest is stored"""
+    __tablename__ = "verification_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # Purged once passed
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Equality-only lookups on a random digest: a hash index beats a btree here
+        Index("ix_verification_tokens_token_hash", "token_hash", postgresql_using="hash"),
+    )
+
+class RefreshToken(Base):
+    """Opaque refresh token, rotated on every use; only its SHA-256 digest is stored"""
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)  # Shared by every rotation of one login
+    token_hash = Column(String(64), nullable=False, unique=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    used_at = Column(DateTime(timezone=True), nullable=True)  # Set when rotated; a second use is a replay
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class EmailOutbox(Base):
+    """Email job written in the same transaction as the change that triggers it"""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # "verification" or "welcome"
+    to_email = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)  # Template variables
+    status = Column(String, nullable=False, default="pending")  # pending / sending / sent / failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    available_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)  # Not claimed before this
+    locked_at = Column(DateTime(timezone=True), nullable=True)  # When a dispatcher claimed it
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_available_at", "status", "available_at"),
+    )
@@ -0,0 +1,149 @@
+# app/outbox.py
+"""Transactional email outbox.
+
+Routes add an EmailOutbox row in the same transaction as the change that
+triggers the email. A dispatcher (lifespan task or ``python -m app.outbox``)
+claims pending rows in batches, delivers them and records the outcome.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import settings
+from .database import session_scope
+from .email_service import email_service
+from .models import EmailOutbox
+
+def enqueue_email(db: AsyncSession, kind: str, to_email: str, **payload) -> EmailOutbox:
+    """Stage an email job in the caller's transaction; it is only visible once they commit"""
+    job = EmailOutbox(kind=kind, to_email=to_email, payload=payload)
+    db.add(job)
+    return job
+
+def _scrub(payload: dict) -> dict:
+    """Drop the raw verification token once the job is finished"""
+    return {key: value for key, value in payload.items() if key != "token"}
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        batch_size: int = 50,
+        poll_interval: float = 2.0,
+        max_attempts: int = 8,
+        retry_backoff: float = 30.0,
+        lease_seconds: float = 300.0,
+    ):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def wake(self):
+        """Ask an in-process dispatcher to poll now instead of at the next interval"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def claim_batch(self, db: AsyncSession) -> List[EmailOutbox]:
+        """Lock and mark a batch of due jobs as sending; concurrent dispatchers skip locked rows"""
+        now = datetime.utcnow()
+        lease_expired = now - timedelta(seconds=self.lease_seconds)
+        result = await db.execute(
+            select(EmailOutbox)
+            .where(or_(
+                and_(EmailOutbox.status == "pending", EmailOutbox.available_at <= now),
+                # Claimed by a dispatcher that died before recording the outcome
+                and_(EmailOutbox.status == "sending", EmailOutbox.locked_at < lease_expired),
+            ))
+            .order_by(EmailOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        jobs = list(result.scalars().all())
+        for job in jobs:
+            job.status = "sending"
+            job.locked_at = now
+            job.attempts += 1
+        await db.commit()
+        return jobs
+
+    async def _deliver(self, job: EmailOutbox) -> Optional[str]:
+        """Returns None on success, otherwise the error to record"""
+        try:
+            if await email_service.deliver(job.kind, job.to_email, job.payload):
+                return None
+            return "SMTP delivery failed"
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+
+    async def run_once(self) -> int:
+        """Claim and deliver one batch; returns the number of jobs processed"""
+        async with session_scope() as db:
+            jobs = await self.claim_batch(db)
+            if not jobs:
+                return 0
+            errors = await asyncio.gather(*(self._deliver(job) for job in jobs))
+            now = datetime.utcnow()
+            for job, error in zip(jobs, errors):
+                job.locked_at = None
+                job.last_error = error
+                if error is None:
+                    job.status = "sent"
+                    job.sent_at = now
+                    job.payload = _scrub(job.payload)
+                elif job.attempts >= self.max_attempts:
+                    job.status = "failed"
+                    job.payload = _scrub(job.payload)
+                else:
+                    job.status = "pending"
+                    job.available_at = now + timedelta(seconds=self.retry_backoff * 2 ** (job.attempts - 1))
+            await db.commit()
+            return len(jobs)
+
+    async def run_forever(self):
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                print(f"❌ Outbox dispatch failed: {e}")
+                processed = 0
+            if processed >= self.batch_size:
+                continue  # More work is probably waiting
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+outbox_dispatcher = OutboxDispatcher(
+    batch_size=settings.outbox_batch_size,
+    poll_interval=settings.outbox_poll_interval_seconds,
+    max_attempts=settings.outbox_max_attempts,
+    retry_backoff=settings.outbox_retry_backoff_seconds,
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver queued outbox emails")
+    parser.add_argument("--once", action="store_true", help="Process a single batch and exit")
+    args = parser.parse_args()
+
+    async def run():
+        await email_service.queue.start()
+        try:
+            if args.once:
+                processed = await outbox_dispatcher.run_once()
+                print(f"📤 Processed {processed} outbox jobs")
+            else:
+                print("📤 Outbox dispatcher running")
+                await outbox_dispatcher.run_forever()
+        finally:
+            await email_service.queue.stop(timeout=settings.email_drain_timeout_seconds)
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# app/passwords.py
+"""Password hashing policy.
+
+``PASSWORD_SCHEMES`` lists the accepted schemes; the first one hashes new
+passwords and the rest are only verified (and upgraded on the next login).
+Hashes whose cost differs from the configured cost are upgraded as well, in
+either direction, so the policy can be tightened or relaxed without a reset.
+argon2 requires the optional ``argon2-cffi`` package.
+
+    python -m app.passwords calibrate --target-ms 250
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List
+from passlib.context import CryptContext
+from .config import settings
+
+SUPPORTED_SCHEMES = ("argon2", "bcrypt")
+
+def build_context(
+    schemes: List[str],
+    bcrypt_rounds: int = 12,
+    argon2_memory_cost: int = 65536,
+    argon2_time_cost: int = 3,
+    argon2_parallelism: int = 4,
+) -> CryptContext:
+    unknown = set(schemes) - set(SUPPORTED_SCHEMES)
+    if unknown:
+        raise ValueError(f"Unsupported password schemes: {', '.join(sorted(unknown))}")
+    config = {"schemes": schemes, "deprecated": "auto"}
+    if "bcrypt" in schemes:
+        # Pinning min/max to the default makes needs_update() flag any other cost
+        config.update({f"bcrypt__{name}": bcrypt_rounds for name in ("default_rounds", "min_rounds", "max_rounds")})
+    if "argon2" in schemes:
+        config.update({
+            "argon2__type": "ID",
+            "argon2__memory_cost": argon2_memory_cost,
+            "argon2__time_cost": argon2_time_cost,
+            "argon2__parallelism": argon2_parallelism,
+        })
+    return CryptContext(**config)
+
+pwd_context = build_context(
+    [scheme.strip() for scheme in settings.password_schemes.split(",") if scheme.strip()],
+    bcrypt_rounds=settings.bcrypt_rounds,
+    argon2_memory_cost=settings.argon2_memory_cost,
+    argon2_time_cost=settings.argon2_time_cost,
+    argon2_parallelism=settings.argon2_parallelism,
+)
+
+def _hash_millis(context: CryptContext, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def calibrate_bcrypt(target_ms: float, samples: int = 3) -> Dict[str, int]:
+    """Highest bcrypt cost whose hash time stays within ``target_ms``"""
+    best = 4
+    for rounds in range(4, 20):
+        if _hash_millis(build_context(["bcrypt"], bcrypt_rounds=rounds), samples) > target_ms:
+            break
+        best = rounds
+    return {"BCRYPT_ROUNDS": best}
+
+def calibrate_argon2(target_ms: float, memory_kib: int = 65536, parallelism: int = 4, samples: int = 3) -> Dict[str, int]:
+    """Highest argon2id time cost within ``target_ms`` at the given memory; halves memory if even t=1 is too slow"""
+    while True:
+        best = 0
+        for time_cost in range(1, 33):
+            context = build_context(
+                ["argon2"], argon2_memory_cost=memory_kib, argon2_time_cost=time_cost, argon2_parallelism=parallelism
+            )
+            if _hash_millis(context, samples) > target_ms:
+                break
+            best = time_cost
+        if best or memory_kib <= 8 * parallelism:
+            return {
+                "ARGON2_MEMORY_COST": memory_kib,
+                "ARGON2_TIME_COST": max(best, 1),
+                "ARGON2_PARALLELISM": parallelism,
+            }
+        memory_kib //= 2
+
+def main():
+    parser = argparse.ArgumentParser(description="Password hashing policy tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    calibrate = subparsers.add_parser("calibrate", help="Find hashing costs that meet a latency target on this machine")
+    calibrate.add_argument("--target-ms", type=float, default=250.0, help="Target time for one hash")
+    calibrate.add_argument("--scheme", choices=SUPPORTED_SCHEMES, default="bcrypt")
+    calibrate.add_argument("--memory-kib", type=int, default=65536, help="argon2 starting memory cost")
+    calibrate.add_argument("--parallelism", type=int, default=4, help="argon2 lanes")
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        if args.scheme == "bcrypt":
+            result = calibrate_bcrypt(args.target_ms)
+        else:
+            result = calibrate_argon2(args.target_ms, args.memory_kib, args.parallelism)
+        print(f"⏱️ Settings for ~{args.target_ms:.0f} ms per {args.scheme} hash on this machine:")
+        for name, value in result.items():
+            print(f"{name}={value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# app/rate_limit.py
+"""Login throttling, checked before any password hashing.
+
+* Per-IP attempts and per-username failures are counted in sliding windows
+  kept in the cache backend (memory:// per process, redis:// shared).
+* Each time a username exhausts its failure budget it is locked out, for
+  twice as long as the previous lockout (up to a cap).
+* A per-worker cap on in-flight password verifications turns overload into
+  fast 429s instead of a growing queue of bcrypt work.
+
+Backend errors fail open: login keeps working without throttling.
+"""
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Tuple
+from .cache import BACKEND_ERRORS, CacheBackend, cache_backend
+from .config import settings
+
+KEY_PREFIX = "auth:login:"
+STRIKE_MEMORY_SECONDS = 86400  # How long past lockouts count towards escalation
+
+class LoginThrottled(Exception):
+    def __init__(self, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+
+class SlidingWindowCounter:
+    """Approximate sliding window: the current fixed window plus a weighted share of the previous one"""
+
+    def __init__(self, backend: CacheBackend, name: str, window: float, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.prefix = f"{KEY_PREFIX}{name}:"
+        self.window = window
+        self.clock = clock
+
+    def _keys(self, key: str) -> Tuple[str, str, float]:
+        index, offset = divmod(self.clock(), self.window)
+        return (
+            f"{self.prefix}{key}:{int(index)}",
+            f"{self.prefix}{key}:{int(index) - 1}",
+            offset / self.window,
+        )
+
+    async def _estimate(self, current: int, previous_key: str, elapsed: float) -> float:
+        previous = int(await self.backend.get(previous_key) or 0)
+        return previous * (1 - elapsed) + current
+
+    async def add(self, key: str) -> float:
+        """Record one event; returns the estimated count including it"""
+        current_key, previous_key, elapsed = self._keys(key)
+        current = await self.backend.incr(current_key, ttl=2 * self.window)
+        return await self._estimate(current, previous_key, elapsed)
+
+    async def reset(self, key: str):
+        current_key, previous_key, _ = self._keys(key)
+        await self.backend.delete(current_key, previous_key)
+
+    def retry_after(self) -> float:
+        """Upper bound on the wait until the oldest counted event stops weighing in"""
+        return self.window - self.clock() % self.window + self.window
+
+class LoginThrottle:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ip_limit: int = 30,
+        ip_window: float = 60.0,
+        failure_limit: int = 5,
+        failure_window: float = 900.0,
+        lockout_base: float = 60.0,
+        lockout_max: float = 3600.0,
+        max_in_flight: int = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.ip_limit = ip_limit
+        self.failure_limit = failure_limit
+        self.lockout_base = lockout_base
+        self.lockout_max = lockout_max
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+        self.ip_attempts = SlidingWindowCounter(backend, "ip", ip_window, clock)
+        self.user_failures = SlidingWindowCounter(backend, "fail", failure_window, clock)
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _lock_key(self, username: str) -> str:
+        return f"{KEY_PREFIX}lock:{username}"
+
+    def _strikes_key(self, username: str) -> str:
+        return f"{KEY_PREFIX}strikes:{username}"
+
+    def _reject(self, retry_after: float, reason: str):
+        self.rejected += 1
+        raise LoginThrottled(retry_after, reason)
+
+    async def check(self, username: str, ip: str):
+        """Count the attempt and raise LoginThrottled if it must be refused"""
+        try:
+            locked_until = await self.backend.get(self._lock_key(username))
+            if locked_until is not None and float(locked_until) > self.clock():
+                self._reject(float(locked_until) - self.clock(), "Account temporarily locked")
+            if self.ip_limit and await self.ip_attempts.add(ip) > self.ip_limit:
+                self._reject(self.ip_attempts.retry_after(), "Too many login attempts")
+        except BACKEND_ERRORS as e:
+            print(f"⚠️ Login throttle unavailable, allowing attempt: {e}")
+
+    async def record_failure(self, username: str):
+        if not self.failure_limit:
+            return
+        try:
+            if await self.user_failures.add(username) < self.failure_limit:
+                return
+            # Failure budget spent: lock out, doubling with each repeat offence
+            strikes = await self.backend.incr(self._strikes_key(username), ttl=STRIKE_MEMORY_SECONDS)
+            duration = min(self.lockout_max, self.lockout_base * 2 ** (strikes - 1))
+            await self.backend.set(self._lock_key(username), str(self.clock() + duration), ttl=duration)
+            await self.user_failures.reset(username)
+        except BACKEND_ERRORS as e:
+            print(f"⚠️ Login throttle unavailable, failure not recorded: {e}")
+
+    async def record_success(self, username: str):
+        try:
+            await self.user_failures.reset(username)
+            await self.backend.delete(self._strikes_key(username))
+        except BACKEND_ERRORS as e:
+            print(f"⚠️ Login throttle unavailable: {e}")
+
+    async def unlock(self, username: str):
+        await self.user_failures.reset(username)
+        await self.backend.delete(self._lock_key(username), self._strikes_key(username))
+
+    async def reset(self):
+        """Forget every counter and lockout"""
+        keys = await self.backend.keys(KEY_PREFIX)
+        if keys:
+            await self.backend.delete(*keys)
+
+    @asynccontextmanager
+    async def verifying(self):
+        """Reserve one of this worker's password-verification slots or refuse immediately"""
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            self._reject(1, "Server is busy, please retry shortly")
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+login_throttle = LoginThrottle(
+    cache_backend,
+    ip_limit=settings.login_ip_limit,
+    ip_window=settings.login_ip_window_seconds,
+    failure_limit=settings.login_failure_limit,
+    failure_window=settings.login_failure_window_seconds,
+    lockout_base=settings.login_lockout_base_seconds,
+    lockout_max=settings.login_lockout_max_seconds,
+    max_in_flight=settings.login_max_in_flight,
+)
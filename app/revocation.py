@@ -0,0 +1,149 @@
+# app/revocation.py
+"""Access-token revocation keyed by the ``jti`` claim.
+
+The shared cache backend is the authoritative store: each revoked jti is a
+key that expires together with the token. Every worker also keeps a Bloom
+filter of revoked jtis, fed by pub/sub and periodic syncs, so that the
+common case (token not revoked) never leaves the process.
+"""
+import asyncio
+import hashlib
+import math
+import time
+from typing import Callable, Dict, List
+from .cache import BACKEND_ERRORS, CacheBackend, cache_backend
+from .config import settings
+
+KEY_PREFIX = "auth:revoked:"
+CHANNEL = "auth:revoked"
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Kirsch-Mitzenmacher: derive k positions from two 64-bit hashes
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class RevocationList:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        sync_interval: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.clock = clock
+        # jti -> exp (epoch seconds) of revocations this worker knows about
+        self._known: Dict[str, float] = {}
+        self._filter = BloomFilter(capacity, error_rate)
+        self._listeners: List[Callable[[str], None]] = []
+        self.filter_hits = 0
+        self.store_lookups = 0
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """Call ``callback(jti)`` whenever this worker learns about a revocation"""
+        self._listeners.append(callback)
+
+    def _add_local(self, jti: str, exp: float):
+        if exp <= self.clock():
+            return
+        self._known[jti] = exp
+        self._filter.add(jti)
+        for callback in self._listeners:
+            callback(jti)
+
+    def compact(self):
+        """Rebuild the filter from unexpired revocations (Bloom filters can't delete)"""
+        now = self.clock()
+        self._known = {jti: exp for jti, exp in self._known.items() if exp > now}
+        bloom = BloomFilter(max(self.capacity, 2 * len(self._known)), self.error_rate)
+        for jti in self._known:
+            bloom.add(jti)
+        self._filter = bloom
+
+    async def revoke(self, jti: str, exp: float):
+        """Revoke ``jti`` until ``exp``; raises a backend error if the store is unreachable"""
+        ttl = exp - self.clock()
+        if ttl <= 0:
+            return
+        self._add_local(jti, exp)
+        await self.backend.set(KEY_PREFIX + jti, str(exp), ttl=ttl)
+        await self.backend.publish(CHANNEL, f"{jti} {exp}")
+
+    async def is_revoked(self, jti: str) -> bool:
+        if jti not in self._filter:
+            return False
+        # Possible false positive: ask the authoritative store
+        self.filter_hits += 1
+        try:
+            self.store_lookups += 1
+            return await self.backend.get(KEY_PREFIX + jti) is not None
+        except BACKEND_ERRORS:
+            # Fail closed on what this worker has seen itself
+            exp = self._known.get(jti)
+            return exp is not None and exp > self.clock()
+
+    async def sync(self):
+        """Load every live revocation from the store, then compact the filter"""
+        keys = await self.backend.keys(KEY_PREFIX)
+        values = await self.backend.mget(keys) if keys else []
+        for key, value in zip(keys, values):
+            jti = key[len(KEY_PREFIX):]
+            if value is not None and jti not in self._known:
+                self._known[jti] = float(value)
+                for callback in self._listeners:
+                    callback(jti)
+        self.compact()
+
+    async def run(self):
+        """Follow revocations from other workers; runs for the app's lifetime"""
+        while True:
+            try:
+                subscription = await self.backend.subscribe(CHANNEL)
+            except BACKEND_ERRORS:
+                await asyncio.sleep(1)
+                continue
+            try:
+                await self.sync()
+                next_sync = time.monotonic() + self.sync_interval
+                while True:
+                    timeout = max(0.0, next_sync - time.monotonic())
+                    try:
+                        message = await asyncio.wait_for(subscription.get_message(), timeout)
+                    except asyncio.TimeoutError:
+                        await self.sync()
+                        next_sync = time.monotonic() + self.sync_interval
+                        continue
+                    jti, _, exp = message.partition(" ")
+                    self._add_local(jti, float(exp))
+            except BACKEND_ERRORS:
+                await asyncio.sleep(1)
+            finally:
+                await subscription.close()
+
+revocation_list = RevocationList(
+    cache_backend,
+    capacity=settings.revocation_bloom_capacity,
+    error_rate=settings.revocation_bloom_error_rate,
+    sync_interval=settings.revocation_sync_interval_seconds,
+)
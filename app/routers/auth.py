@@ -1,61 +1,84 @@
 # app/routers/auth.py
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import ReadSession, get_read_session, get_session, replica_router
 from ..models import User
 from ..schemas import (
-    UserCreate, UserResponse, Token, LoginRequest, 
-    UserRegistrationResponse, EmailVerificationRequest, EmailVerificationResponse
+    UserCreate, UserResponse, Principal, Token, LoginRequest, 
+    UserRegistrationResponse, EmailVerificationRequest, EmailVerificationResponse, TokenData,
+    RefreshRequest, LogoutRequest,
+    BatchRegistrationRequest, BatchRegistrationResponse, BatchRegistrationResult
 )
 from ..auth import (
-    authenticate_user, create_access_token, get_password_hash, 
-    generate_verification_token, verify_email_token
+    authenticate_user, create_access_token, get_password_hash_async,
+    issue_verification_token, verify_email_token, lookup_user,
+    invalidate_cached_user, access_token_claims,
+    issue_refresh_token, rotate_refresh_token, revoke_refresh_token,
+    get_password_hashes_async, insert_users, issue_verification_tokens
 )
-from ..dependencies import get_current_active_user
+from ..dependencies import get_current_active_principal, get_token_data, require_admin_key
 from ..config import settings
-from ..email_service import email_service
+from ..outbox import enqueue_email, outbox_dispatcher
+from ..cache import BACKEND_ERRORS
+from ..rate_limit import login_throttle
+from ..revocation import revocation_list
+from ..user_cache import user_cache
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/register", response_model=UserRegistrationResponse, status_code=status.HTTP_201_CREATED)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
-    # Check if user already exists
-    db_user = db.query(User).filter(
-        (User.email == user.email) | (User.username == user.username)
-    ).first()
+async def register(
+    user: UserCreate,
+    db: AsyncSession = Depends(get_session),
+    read_db: ReadSession = Depends(get_read_session),
+):
+    # Check if user already exists (cached users short-circuit the query)
+    db_user = None
+    if settings.user_cache_enabled:
+        db_user = user_cache.get("email", user.email) or user_cache.get("username", user.username)
+    if db_user is None:
+        result = await read_db.execute(select(User).where(
+            (User.email == user.email) | (User.username == user.username)
+        ))
+        db_user = result.scalars().first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email or username already registered"
         )
     
-    # Generate verification token
-    verification_token = generate_verification_token()
-    
     # Create new user (unverified)
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
         hashed_password=hashed_password,
-        is_verified=False,
-        verification_token=verification_token
+        is_verified=False
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    
-    # Send verification email
-    email_sent = email_service.send_verification_email(
-        to_email=user.email,
-        username=user.username,
-        verification_token=verification_token
-    )
+    try:
+        await db.flush()
+    except IntegrityError:
+        # Registered concurrently, or not yet visible on the replica we checked
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email or username already registered"
+        )
     
-    if not email_sent:
-        # If email fails, still return success but log the error
-        print(f"⚠️ Failed to send verification email to {user.email}")
+    # Generate verification token
+    verification_token = await issue_verification_token(db, db_user.id)
+    # Queue the verification email in the same transaction as the user
+    enqueue_email(db, "verification", user.email, username=user.username, token=verification_token)
+    await db.commit()
+    await db.refresh(db_user)
+    await replica_router.pin_user(db_user)
+    await invalidate_cached_user(db_user)
+    outbox_dispatcher.wake()
     
     return UserRegistrationResponse(
         message="Registration successful! Please check your email to verify your account.",
@@ -65,10 +88,69 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
         verification_required=True
     )
 
+@router.post("/register/batch", response_model=BatchRegistrationResponse, dependencies=[Depends(require_admin_key)])
+async def register_batch(request: BatchRegistrationRequest, db: AsyncSession = Depends(get_session)):
+    results = [
+        BatchRegistrationResult(index=index, email=user.email, username=user.username, success=False)
+        for index, user in enumerate(request.users)
+    ]
+    
+    # Duplicates within the request: the first occurrence wins
+    pending, seen_emails, seen_usernames = [], set(), set()
+    for result, user in zip(results, request.users):
+        if user.email in seen_emails or user.username in seen_usernames:
+            result.error = "Duplicate email or username in request"
+            continue
+        seen_emails.add(user.email)
+        seen_usernames.add(user.username)
+        pending.append((result, user))
+    
+    # One query for every existing conflict
+    if pending:
+        existing = await db.execute(select(User.email, User.username).where(or_(
+            User.email.in_(seen_emails), User.username.in_(seen_usernames)
+        )))
+        taken_emails, taken_usernames = set(), set()
+        for email, username in existing:
+            taken_emails.add(email)
+            taken_usernames.add(username)
+        available = []
+        for result, user in pending:
+            if user.email in taken_emails or user.username in taken_usernames:
+                result.error = "Email or username already registered"
+            else:
+                available.append((result, user))
+        pending = available
+    
+    if pending:
+        hashed_passwords = await get_password_hashes_async([user.password for _, user in pending])
+        created = await insert_users(db, [
+            {"email": user.email, "username": user.username, "hashed_password": hashed_password,
+             "is_active": True, "is_verified": False}
+            for (_, user), hashed_password in zip(pending, hashed_passwords)
+        ])
+        created_ids = {email: user_id for user_id, email, _ in created}
+        tokens = issue_verification_tokens(db, created_ids.values())
+        for result, user in pending:
+            user_id = created_ids.get(user.email)
+            if user_id is None:
+                # Lost a race with a concurrent registration
+                result.error = "Email or username already registered"
+                continue
+            result.success = True
+            result.user_id = user_id
+            # Flushed with the commit as one multi-row insert
+            enqueue_email(db, "verification", user.email, username=user.username, token=tokens[user_id])
+        await db.commit()
+        outbox_dispatcher.wake()
+    
+    created_count = sum(result.success for result in results)
+    return BatchRegistrationResponse(created=created_count, failed=len(results) - created_count, results=results)
+
 @router.post("/verify-email", response_model=EmailVerificationResponse)
-async def verify_email(verification: EmailVerificationRequest, db: Session = Depends(get_db)):
+async def verify_email(verification: EmailVerificationRequest, db: AsyncSession = Depends(get_session)):
     # Verify the token and update user
-    user = verify_email_token(db, verification.token)
+    user = await verify_email_token(db, verification.token)
     
     if not user:
         raise HTTPException(
@@ -76,11 +158,11 @@ async def verify_email(verification: EmailVerificationRequest, db: Session = Dep
             detail="Invalid or expired verification token"
         )
     
-    # Send welcome email
-    email_service.send_welcome_email(
-        to_email=user.email,
-        username=user.username
-    )
+    enqueue_email(db, "welcome", user.email, username=user.username)
+    await db.commit()
+    await replica_router.pin_user(user)
+    await invalidate_cached_user(user)
+    outbox_dispatcher.wake()
     
     return EmailVerificationResponse(
         message="Email verified successfully! You can now log in.",
@@ -89,11 +171,16 @@ async def verify_email(verification: EmailVerificationRequest, db: Session = Dep
     )
 
 @router.post("/login", response_model=Token)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, request: Request, db: AsyncSession = Depends(get_session)):
+    # Refuse throttled attempts before any lookup or hashing
+    client_ip = request.client.host if request.client else "unknown"
+    await login_throttle.check(login_data.username, client_ip)
+    
     # First check if user exists
-    user_check = db.query(User).filter(User.username == login_data.username).first()
+    user_check = await lookup_user(db, "username", login_data.username)
     
     if not user_check:
+        await login_throttle.record_failure(login_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -109,28 +196,60 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         )
     
     # Authenticate user (this now also checks verification)
-    user = authenticate_user(db, login_data.username, login_data.password)
+    async with login_throttle.verifying():
+        user = await authenticate_user(db, login_data.username, login_data.password)
     if not user:
+        await login_throttle.record_failure(login_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    await login_throttle.record_success(login_data.username)
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data=access_token_claims(user), expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = issue_refresh_token(db, user.id)
+    await db.commit()
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest, db: AsyncSession = Depends(get_session)):
+    # No password hashing here: one indexed token lookup, then a signed JWT
+    rotated = await rotate_refresh_token(db, request.refresh_token)
+    user = await lookup_user(db, "id", rotated[0]) if rotated else None
+    if not user or not user.is_active or not user.is_verified:
+        # Persist a family revocation triggered by a replayed token
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    await db.commit()
+    access_token = create_access_token(
+        data=access_token_claims(user),
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes),
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": rotated[1]}
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
+async def read_users_me(current_user: Principal = Depends(get_current_active_principal)):
     return current_user
 
 @router.post("/resend-verification")
-async def resend_verification(email: str, db: Session = Depends(get_db)):
+async def resend_verification(
+    email: str,
+    db: AsyncSession = Depends(get_session),
+    read_db: ReadSession = Depends(get_read_session),
+):
     """Resend verification email for unverified users"""
-    user = db.query(User).filter(User.email == email).first()
+    await read_db.prefer_primary_for("email", email)
+    cached = await lookup_user(read_db, "email", email)
+    # The primary has the authoritative is_verified
+    user = await db.get(User, cached.id) if cached else None
     
     if not user:
         raise HTTPException(
@@ -145,27 +264,31 @@ async def resend_verification(email: str, db: Session = Depends(get_db)):
         )
     
     # Generate new verification token
-    verification_token = generate_verification_token()
-    user.verification_token = verification_token
-    db.commit()
-    
-    # Send verification email
-    email_sent = email_service.send_verification_email(
-        to_email=user.email,
-        username=user.username,
-        verification_token=verification_token
-    )
-    
-    if not email_sent:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to send verification email"
-        )
+    verification_token = await issue_verification_token(db, user.id)
+    enqueue_email(db, "verification", user.email, username=user.username, token=verification_token)
+    await db.commit()
+    await invalidate_cached_user(user)
+    outbox_dispatcher.wake()
     
     return {"message": "Verification email sent successfully"}
 
 @router.post("/logout")
-async def logout():
-    # In a real application, you might want to blacklist the token
-    # For now, we'll just return a success message
+async def logout(
+    body: Optional[LogoutRequest] = None,
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_session),
+):
+    # Revoke the presented token until it would have expired anyway
+    if token_data.jti is not None and token_data.expires_at is not None:
+        try:
+            await revocation_list.revoke(token_data.jti, token_data.expires_at)
+        except BACKEND_ERRORS:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Could not revoke token, please retry",
+                headers={"Retry-After": "1"},
+            )
+    if body is not None and body.refresh_token:
+        await revoke_refresh_token(db, body.refresh_token)
+        await db.commit()
     return {"message": "Successfully logged out"}
\ No newline at end of file
@@ -0,0 +1,16 @@
+# app/routers/jwks.py
+from fastapi import APIRouter, Request, Response
+from ..config import settings
+from ..keys import get_key_ring
+
+router = APIRouter(tags=["keys"])
+
+@router.get("/.well-known/jwks.json")
+async def jwks(request: Request):
+    # Public keys change only on rotation, so verifiers may cache and revalidate cheaply
+    key_ring = get_key_ring()
+    etag = key_ring.jwks_etag()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.jwks_max_age_seconds}"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=key_ring.jwks_body(), media_type="application/json", headers=headers)
@@ -1,7 +1,8 @@
 # app/schemas.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from .config import settings
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -20,6 +21,10 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class Principal(UserResponse):
+    """Authenticated user as seen by protected routes (from token claims or the DB)"""
+    token_version: int = 0
+
 class UserRegistrationResponse(BaseModel):
     message: str
     user_id: int
@@ -27,12 +32,46 @@ class UserRegistrationResponse(BaseModel):
     username: str
     verification_required: bool = True
 
+class BatchRegistrationRequest(BaseModel):
+    users: List[UserCreate] = Field(..., min_length=1, max_length=settings.register_batch_max_size)
+
+class BatchRegistrationResult(BaseModel):
+    index: int  # Position in the request
+    email: str
+    username: str
+    success: bool
+    user_id: Optional[int] = None
+    error: Optional[str] = None
+
+class BatchRegistrationResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BatchRegistrationResult]
+
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
 
 class TokenData(BaseModel):
     username: Optional[str] = None
+    # Principal claims, only present in tokens minted with JWT_STATELESS_AUTH
+    user_id: Optional[int] = None
+    email: Optional[str] = None
+    is_active: Optional[bool] = None
+    is_verified: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    verified_at: Optional[datetime] = None
+    token_version: Optional[int] = None
+    # Revocation handle and expiry (epoch seconds)
+    jti: Optional[str] = None
+    expires_at: Optional[int] = None
 
 class LoginRequest(BaseModel):
     username: str
@@ -0,0 +1,113 @@
+# app/smtp_sink.py
+"""Local SMTP server that accepts and keeps every message (tests and local dev).
+
+    python -m app.smtp_sink --port 1025
+
+Point the app at it with SMTP_HOST=127.0.0.1 SMTP_PORT=1025 SMTP_STARTTLS=false.
+"""
+import argparse
+import asyncio
+import base64
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import List, Optional
+
+class SMTPSink:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages: List[EmailMessage] = []
+        self.connections = 0
+        # Reply to the next N DATA commands with a transient 451 error
+        self.fail_next = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "SMTPSink":
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+
+        async def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 smtp-sink ready")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                verb, _, arg = line.decode().rstrip("\r\n").partition(" ")
+                verb = verb.upper()
+                if verb in ("EHLO", "HELO"):
+                    await reply("250-smtp-sink\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+                elif verb == "AUTH":
+                    mechanism, _, initial = arg.partition(" ")
+                    if mechanism.upper() != "PLAIN":
+                        await reply("504 Unrecognized authentication type")
+                        continue
+                    if not initial:
+                        await reply("334 ")
+                        initial = (await reader.readline()).decode().strip()
+                    base64.b64decode(initial)
+                    await reply("235 Authentication successful")
+                elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    chunks = []
+                    while True:
+                        data_line = await reader.readline()
+                        if data_line in (b".\r\n", b""):
+                            break
+                        if data_line.startswith(b".."):
+                            data_line = data_line[1:]
+                        chunks.append(data_line)
+                    if self.fail_next > 0:
+                        self.fail_next -= 1
+                        await reply("451 Temporary failure, try again")
+                        continue
+                    self.messages.append(message_from_bytes(b"".join(chunks), policy=policy.default))
+                    await reply("250 OK: queued")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        finally:
+            writer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local SMTP sink")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+
+    async def serve():
+        sink = await SMTPSink(args.host, args.port).start()
+        print(f"📭 SMTP sink listening on {sink.host}:{sink.port}")
+        while True:
+            count = len(sink.messages)
+            await asyncio.sleep(1)
+            for message in sink.messages[count:]:
+                print(f"📨 {message['To']}: {message['Subject']}")
+
+    asyncio.run(serve())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# app/token_memo.py
+"""Memo of verified bearer tokens.
+
+Clients reuse one access token for its whole lifetime, so the decoded
+TokenData is kept under a digest of the raw token until shortly before
+``exp``. Signature checks, claim validation and model construction then
+run once per token per worker instead of once per request.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+from .config import settings
+from .schemas import TokenData
+
+def _digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+class TokenMemo:
+    def __init__(self, maxsize: int = 10000, skew: float = 5.0, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self.skew = skew
+        self.clock = clock  # Wall clock: entries expire with the token's exp claim
+        self._entries: "OrderedDict[bytes, Tuple[float, TokenData]]" = OrderedDict()
+        self._by_jti: Dict[str, Set[bytes]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.decode_seconds = 0.0
+
+    def get(self, token: str) -> Optional[TokenData]:
+        key = _digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, token_data = entry
+            if expires_at <= self.clock():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return token_data
+
+    def put(self, token: str, token_data: TokenData):
+        if self.maxsize <= 0 or token_data.expires_at is None:
+            return
+        expires_at = token_data.expires_at - self.skew
+        if expires_at <= self.clock():
+            return
+        key = _digest(token)
+        with self._lock:
+            self._entries[key] = (expires_at, token_data)
+            self._entries.move_to_end(key)
+            if token_data.jti is not None:
+                self._by_jti.setdefault(token_data.jti, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: bytes):
+        _, token_data = self._entries.pop(key)
+        keys = self._by_jti.get(token_data.jti)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_jti[token_data.jti]
+
+    def discard_jti(self, jti: str):
+        """Forget a revoked token"""
+        with self._lock:
+            for key in list(self._by_jti.get(jti, ())):
+                self._remove(key)
+
+    def record_decode(self, seconds: float):
+        self.decodes += 1
+        self.decode_seconds += seconds
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_jti.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "decodes": self.decodes,
+            "decode_seconds": self.decode_seconds,
+        }
+
+token_memo = TokenMemo(maxsize=settings.token_memo_size, skew=settings.token_memo_skew_seconds)
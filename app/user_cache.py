@@ -0,0 +1,175 @@
+# app/user_cache.py
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from .cache import BACKEND_ERRORS, cache_backend
+from .config import settings
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Immutable copy of a users row; safe to share across sessions and requests"""
+    id: int
+    email: str
+    username: str
+    hashed_password: str
+    is_active: bool
+    is_verified: bool
+    token_version: int
+    created_at: Optional[datetime]
+    verified_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            hashed_password=user.hashed_password,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            token_version=user.token_version or 0,
+            created_at=user.created_at,
+            verified_at=user.verified_at,
+        )
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        for field in ("created_at", "verified_at"):
+            if data[field] is not None:
+                data[field] = data[field].isoformat()
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "UserSnapshot":
+        data = json.loads(raw)
+        for field in ("created_at", "verified_at"):
+            if data[field] is not None:
+                data[field] = datetime.fromisoformat(data[field])
+        return cls(**data)
+
+# Lookup fields a snapshot is indexed under
+KEY_FIELDS = ("id", "username", "email")
+
+class UserCache:
+    """Bounded LRU cache of UserSnapshots with a per-entry TTL.
+
+    Each snapshot is stored under ("id", ...), ("username", ...) and
+    ("email", ...) keys; ``maxsize`` bounds the number of keys.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, UserSnapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, field: str, value: Hashable) -> Optional[UserSnapshot]:
+        key = (field, value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def put(self, snapshot: UserSnapshot):
+        expires_at = self.clock() + self.ttl
+        with self._lock:
+            for field in KEY_FIELDS:
+                key = (field, getattr(snapshot, field))
+                self._entries[key] = (expires_at, snapshot)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, **fields: Hashable):
+        """Drop every key of the cached user matching any of ``fields``"""
+        with self._lock:
+            for field, value in fields.items():
+                entry = self._entries.get((field, value))
+                if entry is not None:
+                    snapshot = entry[1]
+                    for key_field in KEY_FIELDS:
+                        self._entries.pop((key_field, getattr(snapshot, key_field)), None)
+                self._entries.pop((field, value), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+user_cache = UserCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds)
+
+# Shared (cross-worker) layer on top of the local cache
+INVALIDATION_CHANNEL = "auth:user-cache:invalidate"
+def _shared_key(field: str, value: Hashable) -> str:
+    return f"auth:user:{field}:{value}"
+
+async def load_shared(field: str, value: Hashable) -> Optional[UserSnapshot]:
+    try:
+        raw = await cache_backend.get(_shared_key(field, value))
+    except BACKEND_ERRORS:
+        return None
+    return UserSnapshot.from_json(raw) if raw is not None else None
+
+async def store_shared(snapshot: UserSnapshot):
+    raw = snapshot.to_json()
+    mapping = {_shared_key(field, getattr(snapshot, field)): raw for field in KEY_FIELDS}
+    try:
+        await cache_backend.mset(mapping, ttl=user_cache.ttl)
+    except BACKEND_ERRORS:
+        pass
+
+async def invalidate_user(id: int, username: str, email: str):
+    """Drop a user from this worker's cache, the shared cache and every other worker's cache"""
+    fields = {"id": id, "username": username, "email": email}
+    user_cache.invalidate(**fields)
+    try:
+        if settings.user_cache_shared:
+            await cache_backend.delete(*(_shared_key(field, value) for field, value in fields.items()))
+        await cache_backend.publish(INVALIDATION_CHANNEL, json.dumps(fields))
+    except BACKEND_ERRORS:
+        pass
+
+async def listen_for_invalidations():
+    """Apply invalidations published by other workers; runs for the app's lifetime"""
+    while True:
+        try:
+            subscription = await cache_backend.subscribe(INVALIDATION_CHANNEL)
+        except BACKEND_ERRORS:
+            await asyncio.sleep(1)
+            continue
+        try:
+            async for message in subscription:
+                user_cache.invalidate(**json.loads(message))
+        except BACKEND_ERRORS:
+            # Entries may have gone stale while we were disconnected
+            user_cache.clear()
+            await asyncio.sleep(1)
+        finally:
+            await subscription.close()
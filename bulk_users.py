@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Bulk user import/export for onboarding tenants and moving users between databases.
+
+    python bulk_users.py import users.csv --workers 8
+    python bulk_users.py import users.jsonl --verified
+    python bulk_users.py export users.jsonl --include-hashes
+
+Input rows need ``email``, ``username`` and either ``password`` (hashed here,
+in parallel across processes) or ``hashed_password`` (any scheme accepted by
+PASSWORD_SCHEMES). Files are streamed in batches, so memory use does not
+depend on file size. No verification emails are sent; imported users who
+are not verified can use /auth/resend-verification.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import BaseModel, EmailStr, ValidationError, model_validator
+from sqlalchemy import insert, or_, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.auth import get_password_hash
+from app.database import engine
+from app.models import User
+from app.passwords import pwd_context
+
+COLUMNS = ["email", "username", "hashed_password", "is_active", "is_verified", "verified_at"]
+EXPORT_COLUMNS = ["id", "email", "username", "is_active", "is_verified", "created_at", "verified_at"]
+
+class ImportRow(BaseModel):
+    email: EmailStr
+    username: str
+    password: Optional[str] = None
+    hashed_password: Optional[str] = None
+    is_active: bool = True
+    is_verified: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def check_password(self):
+        if bool(self.password) == bool(self.hashed_password):
+            raise ValueError("exactly one of password or hashed_password is required")
+        if self.hashed_password and pwd_context.identify(self.hashed_password, required=False) is None:
+            raise ValueError("hashed_password is not in a supported scheme")
+        return self
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, dict]]:
+    """Yield (line number, raw record) without loading the file"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # Empty CSV cells mean "not given"
+            yield reader.line_num, {key: value for key, value in record.items() if value not in ("", None)}
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                yield line_number, json.loads(line)
+
+def _batches(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def _existing(connection: Connection, rows: List[ImportRow]) -> Tuple[set, set]:
+    """One set-based query for the emails/usernames of a batch that are already taken"""
+    emails = [row.email for row in rows]
+    usernames = [row.username for row in rows]
+    result = connection.execute(
+        select(User.email, User.username).where(or_(User.email.in_(emails), User.username.in_(usernames)))
+    )
+    taken_emails, taken_usernames = set(), set()
+    for email, username in result:
+        taken_emails.add(email)
+        taken_usernames.add(username)
+    return taken_emails, taken_usernames
+
+def _copy(connection: Connection, values: List[tuple]) -> bool:
+    """Load rows with COPY when the driver is psycopg 3; returns False if unavailable"""
+    driver_connection = connection.connection.driver_connection
+    cursor = driver_connection.cursor()
+    if not hasattr(cursor, "copy"):
+        return False
+    with cursor.copy(f"COPY users ({', '.join(COLUMNS)}) FROM STDIN") as copy:
+        for row in values:
+            copy.write_row(row)
+    return True
+
+def _insert(connection: Connection, values: List[tuple], ignore_conflicts: bool = False) -> int:
+    statement = insert(User.__table__)
+    if ignore_conflicts:
+        if connection.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+            statement = pg_insert(User.__table__).on_conflict_do_nothing()
+        else:
+            statement = statement.prefix_with("OR IGNORE")
+    # executemany; SQLAlchemy batches this into multi-row INSERTs
+    result = connection.execute(statement, [dict(zip(COLUMNS, row)) for row in values])
+    return result.rowcount if result.rowcount >= 0 else len(values)
+
+def import_users(
+    stream: TextIO,
+    fmt: str = "csv",
+    db_engine: Engine = engine,
+    executor: Optional[Executor] = None,
+    batch_size: int = 2000,
+    verified: bool = False,
+) -> Dict[str, int]:
+    stats = {"imported": 0, "duplicates": 0, "invalid": 0}
+    now = datetime.utcnow()
+    for batch in _batches(read_records(stream, fmt), batch_size):
+        rows: List[ImportRow] = []
+        seen_emails, seen_usernames = set(), set()
+        for line_number, record in batch:
+            try:
+                row = ImportRow.model_validate(record)
+            except ValidationError as e:
+                stats["invalid"] += 1
+                print(f"⚠️ Line {line_number}: {e.errors()[0]['msg']}", file=sys.stderr)
+                continue
+            if row.email in seen_emails or row.username in seen_usernames:
+                stats["duplicates"] += 1
+                continue
+            seen_emails.add(row.email)
+            seen_usernames.add(row.username)
+            rows.append(row)
+        if not rows:
+            continue
+
+        with db_engine.begin() as connection:
+            taken_emails, taken_usernames = _existing(connection, rows)
+        fresh = [row for row in rows if row.email not in taken_emails and row.username not in taken_usernames]
+        stats["duplicates"] += len(rows) - len(fresh)
+
+        plain = [row.password for row in fresh if row.password]
+        if executor is not None:
+            hashes = executor.map(get_password_hash, plain, chunksize=max(1, len(plain) // 64))
+        else:
+            hashes = map(get_password_hash, plain)
+        hashes = iter(hashes)
+        values = []
+        for row in fresh:
+            is_verified = verified if row.is_verified is None else row.is_verified
+            values.append((
+                row.email,
+                row.username,
+                row.hashed_password or next(hashes),
+                row.is_active,
+                is_verified,
+                now if is_verified else None,
+            ))
+        if not values:
+            continue
+
+        try:
+            with db_engine.begin() as connection:
+                if not _copy(connection, values):
+                    _insert(connection, values)
+            inserted = len(values)
+        except (IntegrityError, db_engine.dialect.loaded_dbapi.IntegrityError):
+            # Someone registered one of these users since the check; keep the rest
+            with db_engine.begin() as connection:
+                inserted = _insert(connection, values, ignore_conflicts=True)
+            stats["duplicates"] += len(values) - inserted
+        stats["imported"] += inserted
+        print(f"📥 {stats['imported']} imported, {stats['duplicates']} duplicates, {stats['invalid']} invalid", file=sys.stderr)
+    return stats
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def export_users(stream: TextIO, fmt: str = "jsonl", db_engine: Engine = engine, include_hashes: bool = False, batch_size: int = 2000) -> int:
+    columns = EXPORT_COLUMNS + (["hashed_password"] if include_hashes else [])
+    exported = 0
+    with db_engine.connect() as connection:
+        # Server-side cursor: rows arrive in batches instead of all at once
+        result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(
+            select(*(getattr(User, column) for column in columns)).order_by(User.id)
+        )
+        writer = csv.writer(stream) if fmt == "csv" else None
+        if writer:
+            writer.writerow(columns)
+        for row in result:
+            if writer:
+                writer.writerow(row)
+            else:
+                stream.write(json.dumps({column: _json_value(value) for column, value in zip(columns, row)}) + "\n")
+            exported += 1
+    return exported
+
+def _format(path: str, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    return "csv" if path.endswith(".csv") else "jsonl"
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import/export users")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Load users from a CSV or JSONL file ('-' for stdin)")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=("csv", "jsonl"))
+    import_parser.add_argument("--batch-size", type=int, default=2000)
+    import_parser.add_argument("--workers", type=int, default=None, help="Hashing processes (default: CPU count)")
+    import_parser.add_argument("--verified", action="store_true", help="Mark users verified unless a row says otherwise")
+
+    export_parser = subparsers.add_parser("export", help="Stream the users table to a CSV or JSONL file ('-' for stdout)")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--format", choices=("csv", "jsonl"))
+    export_parser.add_argument("--include-hashes", action="store_true", help="Include password hashes (for re-import)")
+    args = parser.parse_args()
+
+    fmt = _format(args.path, args.format)
+    if args.command == "import":
+        stream = nullcontext(sys.stdin) if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+        with stream as stream, ProcessPoolExecutor(max_workers=args.workers) as executor:
+            stats = import_users(stream, fmt, executor=executor, batch_size=args.batch_size, verified=args.verified)
+        print(f"✅ Imported {stats['imported']} users ({stats['duplicates']} duplicates, {stats['invalid']} invalid skipped)")
+    else:
+        stream = nullcontext(sys.stdout) if args.path == "-" else open(args.path, "w", newline="", encoding="utf-8")
+        with stream as stream:
+            exported = export_users(stream, fmt, include_hashes=args.include_hashes)
+        print(f"✅ Exported {exported} users", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
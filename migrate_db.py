@@ -1,83 +1,62 @@
 #!/usr/bin/env python3
 """
-Database migration script to add email verification fields
-Run this after updating your models
+Database migration script: applies the Alembic revisions in alembic/versions.
+Run it once per deploy, before starting the API workers.
+
+    python migrate_db.py              # upgrade to the latest revision
+    python migrate_db.py --sql        # print the SQL instead of running it
+    python migrate_db.py --check      # exit non-zero if the database is behind
 """
 
-from sqlalchemy import text
+import argparse
+import sys
+
+from alembic import command
+from sqlalchemy import inspect
+
 from app.database import engine
+from app.migrations import alembic_config, current_revision, head_revision
 
-def migrate_database():
-    """Add email verification columns to existing users table"""
-    
-    migration_sql = """
-    -- Add email verification columns
-    ALTER TABLE users 
-    ADD COLUMN IF NOT EXISTS is_verified BOOLEAN DEFAULT FALSE,
-    ADD COLUMN IF NOT EXISTS verification_token VARCHAR,
-    ADD COLUMN IF NOT EXISTS verified_at TIMESTAMP WITH TIME ZONE;
-    
-    -- Update existing users to be verified (optional - for existing users)
-    -- Uncomment the next line if you want existing users to be automatically verified
-    -- UPDATE users SET is_verified = TRUE WHERE is_verified IS NULL;
-    """
-    
-    try:
-        with engine.connect() as connection:
-            connection.execute(text(migration_sql))
-            connection.commit()
-            print("✅ Database migration completed successfully!")
-            print("   - Added is_verified column")
-            print("   - Added verification_token column") 
-            print("   - Added verified_at column")
-            
-    except Exception as e:
-        print(f"❌ Migration failed: {e}")
-        print("💡 This is normal if columns already exist")
+BASELINE_REVISION = "0001_baseline"
 
-def check_migration():
-    """Check if migration was successful"""
-    check_sql = """
-    SELECT column_name 
-    FROM information_schema.columns 
-    WHERE table_name = 'users' 
-    AND column_name IN ('is_verified', 'verification_token', 'verified_at');
-    """
-    
-    try:
-        with engine.connect() as connection:
-            result = connection.execute(text(check_sql))
-            columns = [row[0] for row in result]
-            
-            print("\n📊 Current users table columns:")
-            if 'is_verified' in columns:
-                print("✅ is_verified - Present")
-            else:
-                print("❌ is_verified - Missing")
-                
-            if 'verification_token' in columns:
-                print("✅ verification_token - Present") 
-            else:
-                print("❌ verification_token - Missing")
-                
-            if 'verified_at' in columns:
-                print("✅ verified_at - Present")
-            else:
-                print("❌ verified_at - Missing")
-                
-    except Exception as e:
-        print(f"❌ Check failed: {e}")
+def adopt_legacy_database(config):
+    """Databases created before Alembic (create_all / ALTER TABLE) start from the baseline"""
+    inspector = inspect(engine)
+    if inspector.has_table("users") and not inspector.has_table("alembic_version"):
+        print(f"📌 Existing schema without Alembic history, stamping {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+
+def migrate_database(sql: bool = False):
+    config = alembic_config()
+    if sql:
+        command.upgrade(config, "head", sql=True)
+        return
+    adopt_legacy_database(config)
+    command.upgrade(config, "head")
+    print(f"✅ Database migrated to {current_revision(engine)}")
+
+def check_migration() -> bool:
+    """Check if the database is at the latest revision"""
+    current, head = current_revision(engine), head_revision()
+    if current == head:
+        print(f"✅ Database is up to date ({head})")
+        return True
+    print(f"❌ Database is at {current or 'no revision'}, latest is {head}")
+    return False
 
 if __name__ == "__main__":
-    print("🔄 Starting database migration for email verification...")
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--sql", action="store_true", help="Print the migration SQL without running it")
+    parser.add_argument("--check", action="store_true", help="Only report whether migrations are pending")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check_migration() else 1)
+
+    print("🔄 Starting database migration...")
     print("=" * 50)
-    
-    migrate_database()
-    check_migration()
-    
-    print("\n✨ Migration complete! Your auth service now supports email verification.")
-    print("\n📝 Next steps:")
-    print("1. Set up your Gmail App Password in .env file")
-    print("2. Update EMAIL_USER and EMAIL_PASSWORD in .env")
-    print("3. Restart your FastAPI server")
-    print("4. Test registration with email verification")
\ No newline at end of file
+    try:
+        migrate_database(sql=args.sql)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
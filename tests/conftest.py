@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -5,7 +6,10 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.database import get_db, Base
+from app.database import get_db, Base, SessionLocal
+from app.user_cache import user_cache
+from app.token_memo import token_memo
+from app.rate_limit import login_throttle
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
@@ -18,6 +22,9 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 
 Base.metadata.create_all(bind=engine)
 
+# Background work (outbox dispatcher, session_scope) uses SessionLocal directly
+SessionLocal.configure(bind=engine)
+
 def override_get_db():
     try:
         db = TestingSessionLocal()
@@ -27,6 +34,20 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    # Tests share usernames across separate databases
+    user_cache.clear()
+
+@pytest.fixture(autouse=True)
+def clear_token_memo():
+    token_memo.clear()
+
+@pytest.fixture(autouse=True)
+def reset_login_throttle():
+    # Every TestClient request comes from the same address
+    asyncio.run(login_throttle.reset())
+
 @pytest.fixture
 def client():
     return TestClient(app)
\ No newline at end of file
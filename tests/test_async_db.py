@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.database import Base, get_session, to_async_url
+from app.models import EmailOutbox
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert to_async_url("postgresql://u:p@db:5432/auth_db") == "postgresql+psycopg://u:p@db:5432/auth_db"
+
+@pytest.fixture
+def async_client():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    AsyncTestingSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_tables())
+
+    async def override_get_session():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_session] = override_get_session
+    try:
+        yield TestClient(app), AsyncTestingSessionLocal
+    finally:
+        del app.dependency_overrides[get_session]
+
+def test_register_verify_login_with_async_session(async_client):
+    client, session_factory = async_client
+    response = client.post(
+        "/auth/register",
+        json={"email": "async@example.com", "username": "asyncuser", "password": "testpassword123"},
+    )
+    assert response.status_code == 201
+
+    async def fetch_token():
+        async with session_factory() as db:
+            result = await db.execute(select(EmailOutbox.payload).where(EmailOutbox.to_email == "async@example.com"))
+            return result.scalar_one()["token"]
+
+    token = asyncio.run(fetch_token())
+    response = client.post("/auth/verify-email", json={"token": token})
+    assert response.status_code == 200
+
+    response = client.post("/auth/login", json={"username": "asyncuser", "password": "testpassword123"})
+    assert response.status_code == 200
+    access_token = response.json()["access_token"]
+
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {access_token}"})
+    assert response.status_code == 200
+    assert response.json()["username"] == "asyncuser"
@@ -0,0 +1,44 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.database import session_scope
+from app.models import EmailOutbox, VerificationToken
+
+def _user(name: str) -> dict:
+    return {"email": f"{name}@example.com", "username": name, "password": "testpassword123"}
+
+def test_batch_requires_admin_key(client: TestClient, monkeypatch):
+    body = {"users": [_user("nokey")]}
+    assert client.post("/auth/register/batch", json=body).status_code == 404
+
+    monkeypatch.setattr(settings, "admin_api_key", "s3cret")
+    assert client.post("/auth/register/batch", json=body, headers={"X-Admin-Key": "wrong"}).status_code == 403
+
+def test_batch_reports_each_item(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "admin_api_key", "s3cret")
+    assert client.post("/auth/register", json=_user("batchtaken")).status_code == 201
+
+    users = [_user("batch1"), _user("batchtaken"), _user("batch2"), {**_user("batch3"), "username": "batch1"}]
+    response = client.post("/auth/register/batch", json={"users": users}, headers={"X-Admin-Key": "s3cret"})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (2, 2)
+    assert [item["success"] for item in data["results"]] == [True, False, True, False]
+    assert data["results"][1]["error"] == "Email or username already registered"
+    assert data["results"][3]["error"] == "Duplicate email or username in request"
+    created_ids = [item["user_id"] for item in data["results"] if item["success"]]
+
+    async def staged():
+        async with session_scope() as db:
+            emails = await db.scalar(select(func.count()).select_from(EmailOutbox).where(
+                EmailOutbox.to_email.in_(["batch1@example.com", "batch2@example.com"])
+            ))
+            tokens = await db.scalar(select(func.count()).select_from(VerificationToken).where(
+                VerificationToken.user_id.in_(created_ids)
+            ))
+            return emails, tokens
+
+    assert asyncio.run(staged()) == (2, 2)
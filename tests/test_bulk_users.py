@@ -0,0 +1,50 @@
+import io
+import json
+
+from sqlalchemy import select
+
+from bulk_users import export_users, import_users
+from app.auth import verify_password
+from app.database import SessionLocal
+from app.models import User
+from app.passwords import build_context
+
+def _engine():
+    return SessionLocal.kw["bind"]
+
+def test_import_skips_duplicates_and_invalid_rows():
+    prehashed = build_context(["bcrypt"], bcrypt_rounds=4).hash("imported-secret")
+    source = io.StringIO(
+        "email,username,password,hashed_password,is_verified\n"
+        "bulk1@example.com,bulk1,plain-secret,,\n"
+        f"bulk2@example.com,bulk2,,{prehashed},true\n"
+        "bulk1@example.com,bulk1-again,other-secret,,\n"  # Duplicate email in the batch
+        "not-an-email,bulk3,plain-secret,,\n"
+        "bulk4@example.com,bulk4,,not-a-hash,\n"
+    )
+    stats = import_users(source, "csv", db_engine=_engine(), batch_size=2)
+    assert stats == {"imported": 2, "duplicates": 1, "invalid": 2}
+
+    # A second run finds both users already present
+    source.seek(0)
+    assert import_users(source, "csv", db_engine=_engine())["duplicates"] == 3
+
+    with SessionLocal() as db:
+        users = {user.username: user for user in db.scalars(select(User).where(User.username.in_(["bulk1", "bulk2"])))}
+    assert verify_password("plain-secret", users["bulk1"].hashed_password)
+    assert users["bulk2"].hashed_password == prehashed
+    assert users["bulk2"].is_verified and not users["bulk1"].is_verified
+
+def test_export_streams_jsonl_without_hashes():
+    import_users(
+        io.StringIO(json.dumps({"email": "export@example.com", "username": "exportuser", "hashed_password": build_context(["bcrypt"], bcrypt_rounds=4).hash("x")}) + "\n"),
+        "jsonl",
+        db_engine=_engine(),
+        verified=True,
+    )
+    output = io.StringIO()
+    assert export_users(output, "jsonl", db_engine=_engine()) >= 1
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    exported = next(row for row in rows if row["username"] == "exportuser")
+    assert exported["is_verified"] is True
+    assert "hashed_password" not in exported
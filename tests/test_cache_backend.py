@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.cache import MemoryBackend, RedisBackend
+from app.cache.fake_redis import FakeRedisServer
+
+@pytest_asyncio.fixture(params=["memory", "redis"])
+async def backend(request):
+    if request.param == "memory":
+        yield MemoryBackend()
+        return
+    async with FakeRedisServer() as server:
+        backend = RedisBackend(server.url)
+        yield backend
+        await backend.close()
+
+@pytest.mark.asyncio
+async def test_get_set_delete(backend):
+    assert await backend.get("missing") is None
+    await backend.set("key", "value")
+    assert await backend.get("key") == "value"
+    assert await backend.delete("key", "missing") == 1
+    assert await backend.get("key") is None
+
+@pytest.mark.asyncio
+async def test_ttl_expires_keys(backend):
+    await backend.set("short", "value", ttl=0.05)
+    assert await backend.get("short") == "value"
+    await asyncio.sleep(0.1)
+    assert await backend.get("short") is None
+
+@pytest.mark.asyncio
+async def test_mset_mget_round_trip(backend):
+    await backend.mset({"a": "1", "b": "2"}, ttl=60)
+    assert await backend.mget(["a", "missing", "b"]) == ["1", None, "2"]
+    assert await backend.get_many(["a", "missing"]) == {"a": "1"}
+
+@pytest.mark.asyncio
+async def test_publish_reaches_subscriber(backend):
+    subscription = await backend.subscribe("events")
+    try:
+        assert await backend.publish("events", "hello") == 1
+        assert await asyncio.wait_for(subscription.get_message(), timeout=1) == "hello"
+    finally:
+        await subscription.close()
+
+@pytest.mark.asyncio
+async def test_keys_by_prefix(backend):
+    await backend.mset({"auth:a": "1", "auth:b": "2", "other": "3"})
+    assert sorted(await backend.keys("auth:")) == ["auth:a", "auth:b"]
+
+@pytest.mark.asyncio
+async def test_incr_with_ttl(backend):
+    assert await backend.incr("counter", ttl=60) == 1
+    assert await backend.incr("counter", 2, ttl=60) == 3
+    assert await backend.get("counter") == "3"
+    assert await backend.incr("counter", ttl=0.05) == 4
+    await asyncio.sleep(0.1)
+    assert await backend.get("counter") is None
@@ -0,0 +1,55 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from app.main import app
+from app.config import settings
+from app.database import PoolMetrics, engine_options
+
+def test_engine_options_apply_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "database_pool_size", 3)
+    monkeypatch.setattr(settings, "database_pool_recycle", 600)
+    options = engine_options("sqlite:///./pool.db", PoolMetrics("test"))
+    assert options["pool_size"] == 3
+    assert options["pool_recycle"] == 600
+    assert options["pool_pre_ping"] is settings.database_pool_pre_ping
+    assert options["connect_args"] == {"check_same_thread": False}
+    # In-memory SQLite keeps SQLAlchemy's default pool
+    assert "poolclass" not in engine_options("sqlite://", PoolMetrics("test"))
+
+def test_pgbouncer_disables_prepared_statements(monkeypatch):
+    url = "postgresql+psycopg://u:p@pgbouncer:6432/auth_db"
+    assert "prepare_threshold" not in engine_options(url, PoolMetrics("test"))["connect_args"]
+    monkeypatch.setattr(settings, "database_pgbouncer", True)
+    assert engine_options(url, PoolMetrics("test"))["connect_args"] == {"prepare_threshold": None}
+    assert engine_options(url, PoolMetrics("test"), is_async=True)["connect_args"] == {"prepare_threshold": None}
+
+def test_pool_metrics_track_checkouts_and_overflow(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "database_pool_size", 1)
+    monkeypatch.setattr(settings, "database_max_overflow", 1)
+    monkeypatch.setattr(settings, "database_pool_timeout", 0.05)
+    metrics = PoolMetrics("test")
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **engine_options(url, metrics))
+
+    first, second = engine.connect(), engine.connect()
+    first.execute(text("SELECT 1"))
+    stats = metrics.stats()
+    assert stats["checkouts"] == 2
+    assert stats["in_use"] == 2 and stats["overflow"] == 1
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    assert metrics.stats()["timeouts"] == 1
+
+    first.close()
+    second.close()
+    assert metrics.stats()["in_use"] == 0
+    engine.dispose()
+    # The replacement pool reports from now on
+    assert metrics.pool is engine.pool
+
+def test_health_reports_pool_metrics():
+    with TestClient(app) as client:
+        body = client.get("/health").json()
+    assert body["status"] == "healthy"
+    assert "primary" in body["database_pool"]
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.email_queue import EmailQueue
+from app.email_service import EmailService
+from app.email_templates import WELCOME
+from app.smtp_sink import SMTPSink
+
+HELLO = WELCOME.render(username="tester", frontend_url="http://localhost:3000")
+
+def _service_for(sink: SMTPSink) -> EmailService:
+    service = EmailService()
+    service.smtp_server = sink.host
+    service.smtp_port = sink.port
+    service.smtp_starttls = False
+    service.email = "noreply@example.com"
+    service.password = "secret"
+    return service
+
+@pytest.mark.asyncio
+async def test_queued_messages_share_one_smtp_session():
+    async with SMTPSink() as sink:
+        service = _service_for(sink)
+        queue = EmailQueue(service._connect, workers=1, batch_size=10)
+        await queue.start()
+        futures = [
+            queue.enqueue(service._build_message(f"user{i}@example.com", HELLO))
+            for i in range(5)
+        ]
+        assert await asyncio.gather(*futures) == [True] * 5
+        await queue.stop(timeout=5)
+
+    assert sorted(message["To"] for message in sink.messages) == [f"user{i}@example.com" for i in range(5)]
+    assert sink.connections == 1
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried():
+    async with SMTPSink() as sink:
+        sink.fail_next = 2
+        service = _service_for(sink)
+        queue = EmailQueue(service._connect, workers=1, backoff_base=0.01, max_attempts=3)
+        await queue.start()
+        assert await queue.enqueue(service._build_message("retry@example.com", HELLO))
+        await queue.stop(timeout=5)
+
+    assert [message["To"] for message in sink.messages] == ["retry@example.com"]
+
+@pytest.mark.asyncio
+async def test_gives_up_and_runs_fallback_after_max_attempts():
+    fallbacks = []
+    async with SMTPSink() as sink:
+        sink.fail_next = 10
+        service = _service_for(sink)
+        queue = EmailQueue(service._connect, workers=1, backoff_base=0.01, max_attempts=2)
+        await queue.start()
+        sent = await queue.enqueue(
+            service._build_message("lost@example.com", HELLO),
+            on_failure=lambda: fallbacks.append("lost@example.com"),
+        )
+        await queue.stop(timeout=5)
+
+    assert sent is False
+    assert fallbacks == ["lost@example.com"]
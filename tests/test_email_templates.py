@@ -0,0 +1,25 @@
+from app.email_service import EmailService
+from app.email_templates import CompiledTemplate, VERIFICATION
+
+def test_html_values_are_escaped_and_text_values_are_not():
+    rendered = VERIFICATION.render(
+        username='<script>alert("x")</script>',
+        verification_link="http://localhost:3000?token=abc&x=1",
+    )
+    assert "<script>" not in rendered.html
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;" in rendered.html
+    assert 'href="http://localhost:3000?token=abc&amp;x=1"' in rendered.html
+    assert '<script>alert("x")</script>' in rendered.text
+    assert "http://localhost:3000?token=abc&x=1" in rendered.text
+
+def test_compiled_template_substitutes_every_placeholder():
+    template = CompiledTemplate("a {{ x }} b {{y}} c {{ x }}")
+    assert template.names == ["x", "y", "x"]
+    assert template.render({"x": 1, "y": 2}) == "a 1 b 2 c 1"
+
+def test_message_has_plain_text_and_html_alternatives():
+    service = EmailService()
+    rendered = VERIFICATION.render(username="tester", verification_link="http://localhost:3000?token=abc")
+    msg = service._build_message("tester@example.com", rendered)
+    assert [part.get_content_type() for part in msg.get_payload()] == ["text/plain", "text/html"]
+    assert msg["Subject"] == VERIFICATION.subject_header
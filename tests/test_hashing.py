@@ -0,0 +1,34 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.auth import get_password_hash, verify_password
+from app.hashing import HashingPool, HashingPoolSaturated
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_on_pool():
+    pool = HashingPool(kind="thread", workers=2, queue_size=2)
+    try:
+        hashed = await pool.run(get_password_hash, "testpassword123")
+        assert await pool.run(verify_password, "testpassword123", hashed)
+        assert not await pool.run(verify_password, "wrong", hashed)
+    finally:
+        pool.shutdown()
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_saturated():
+    pool = HashingPool(kind="thread", workers=1, queue_size=1)
+    release = threading.Event()
+    try:
+        blocked = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.in_flight == 2
+        with pytest.raises(HashingPoolSaturated):
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(*blocked)
+        assert pool.in_flight == 0
+    finally:
+        release.set()
+        pool.shutdown()
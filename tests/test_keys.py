@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from fastapi.testclient import TestClient
+from jose import JWTError, jwt
+
+import app.keys
+from app.auth import create_access_token, verify_token
+from app.keys import KeyRing, generate_key
+
+def _pem(algorithm: str) -> bytes:
+    return generate_key(algorithm).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+
+def _public_pem(private_pem: bytes) -> bytes:
+    key = serialization.load_pem_private_key(private_pem, password=None)
+    return key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+
+@pytest.fixture
+def key_dir(tmp_path):
+    old = _pem("RS256")
+    (tmp_path / "2024-old.pem").write_bytes(old)
+    (tmp_path / "2025-new.pem").write_bytes(_pem("ES256"))
+    return tmp_path, old
+
+def test_rotation_keeps_retiring_keys_verifiable(key_dir):
+    directory, old_pem = key_dir
+    old_ring = KeyRing.from_directory(str(directory), "2024-old")
+    old_token = old_ring.sign({"sub": "alice"})
+
+    (directory / "2024-old.pem").write_bytes(_public_pem(old_pem))  # Private half retired
+    ring = KeyRing.from_directory(str(directory))
+    assert ring.active_kid == "2025-new"
+    assert ring.algorithm == "ES256"
+    assert ring.decode(old_token)["sub"] == "alice"
+    assert ring.decode(ring.sign({"sub": "bob"}))["sub"] == "bob"
+
+    with pytest.raises(ValueError):
+        KeyRing.from_directory(str(directory), "2024-old")
+
+def test_unknown_kid_rejected(key_dir):
+    directory, _ = key_dir
+    other = KeyRing()
+    other.add("2025-new", _pem("ES256"))  # Same kid, different key
+    other.active_kid = "2025-new"
+    with pytest.raises(JWTError):
+        KeyRing.from_directory(str(directory)).decode(other.sign({"sub": "mallory"}))
+
+    stranger = KeyRing()
+    stranger.add("unknown", _pem("RS256"))
+    stranger.active_kid = "unknown"
+    with pytest.raises(JWTError):
+        KeyRing.from_directory(str(directory)).decode(stranger.sign({"sub": "mallory"}))
+
+def test_jwks_endpoint_is_cacheable(client: TestClient, key_dir, monkeypatch):
+    directory, _ = key_dir
+    ring = KeyRing.from_directory(str(directory))
+    monkeypatch.setattr(app.keys, "_key_ring", ring)
+
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert "max-age" in response.headers["cache-control"]
+    keys = response.json()["keys"]
+    assert {key["kid"] for key in keys} == {"2024-old", "2025-new"}
+    assert all("d" not in key for key in keys)  # Public halves only
+
+    # Offline verification from the published set alone
+    token = ring.sign({"sub": "alice"})
+    published = {key["kid"]: key for key in keys}
+    assert jwt.decode(token, published["2025-new"], algorithms=["ES256"])["sub"] == "alice"
+
+    etag = response.headers["etag"]
+    response = client.get("/.well-known/jwks.json", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+def test_login_tokens_signed_with_active_key(client: TestClient, key_dir, monkeypatch):
+    directory, _ = key_dir
+    monkeypatch.setattr(app.keys, "_key_ring", KeyRing.from_directory(str(directory)))
+    token = create_access_token({"sub": "alice"})
+    assert jwt.get_unverified_header(token)["kid"] == "2025-new"
+    assert asyncio.run(verify_token(token)).username == "alice"
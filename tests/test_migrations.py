@@ -0,0 +1,47 @@
+import asyncio
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+
+import migrate_db
+from app.database import Base
+from app.migrations import alembic_config, check_schema, current_revision, head_revision
+
+def _url(tmp_path):
+    return f"sqlite:///{tmp_path / 'migrations.db'}"
+
+def test_upgrade_matches_models_and_downgrades(tmp_path):
+    url = _url(tmp_path)
+    command.upgrade(alembic_config(url), "head")
+    engine = create_engine(url)
+    assert current_revision(engine) == head_revision()
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+
+    command.downgrade(alembic_config(url), "base")
+    assert set(inspect(engine).get_table_names()) == {"alembic_version"}
+    engine.dispose()
+
+def test_legacy_database_is_adopted(tmp_path, monkeypatch):
+    url = _url(tmp_path)
+    # A database built by the old create_all/ALTER TABLE scripts: baseline schema, no history
+    command.upgrade(alembic_config(url), "0001_baseline")
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE alembic_version")
+
+    monkeypatch.setattr(migrate_db, "engine", engine)
+    monkeypatch.setattr(migrate_db, "alembic_config", lambda: alembic_config(url))
+    assert not migrate_db.check_migration()
+    migrate_db.migrate_database()
+    assert migrate_db.check_migration()
+    assert "token_version" in {column["name"] for column in inspect(engine).get_columns("users")}
+    engine.dispose()
+
+def test_schema_check_warns_without_failing(tmp_path, capsys):
+    engine = create_engine(_url(tmp_path))
+    asyncio.run(check_schema(engine))
+    assert "no revision" in capsys.readouterr().out
+    engine.dispose()
@@ -0,0 +1,51 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.database import session_scope
+from app.email_service import email_service
+from app.models import EmailOutbox, User
+from app.outbox import OutboxDispatcher
+from app.smtp_sink import SMTPSink
+
+async def _jobs_for(to_email: str):
+    async with session_scope() as db:
+        result = await db.execute(select(EmailOutbox).where(EmailOutbox.to_email == to_email))
+        return list(result.scalars().all())
+
+def test_register_writes_outbox_job(client: TestClient):
+    response = client.post(
+        "/auth/register",
+        json={"email": "outbox@example.com", "username": "outboxuser", "password": "testpassword123"},
+    )
+    assert response.status_code == 201
+
+    jobs = asyncio.run(_jobs_for("outbox@example.com"))
+    assert [(job.kind, job.status) for job in jobs] == [("verification", "pending")]
+    assert jobs[0].payload["username"] == "outboxuser"
+
+def test_dispatcher_delivers_and_records_status(client: TestClient, monkeypatch):
+    client.post(
+        "/auth/register",
+        json={"email": "dispatch@example.com", "username": "dispatchuser", "password": "testpassword123"},
+    )
+
+    async def dispatch():
+        async with SMTPSink() as sink:
+            monkeypatch.setattr(email_service, "smtp_server", sink.host)
+            monkeypatch.setattr(email_service, "smtp_port", sink.port)
+            monkeypatch.setattr(email_service, "smtp_starttls", False)
+            monkeypatch.setattr(email_service, "email", "noreply@example.com")
+            monkeypatch.setattr(email_service, "password", "secret")
+            dispatcher = OutboxDispatcher(batch_size=100)
+            while await dispatcher.run_once():
+                pass
+            return sink.messages
+
+    messages = asyncio.run(dispatch())
+    assert "dispatch@example.com" in [message["To"] for message in messages]
+
+    jobs = asyncio.run(_jobs_for("dispatch@example.com"))
+    assert [(job.status, job.attempts) for job in jobs] == [("sent", 1)]
+    assert jobs[0].sent_at is not None
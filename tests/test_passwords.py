@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+import app.auth
+from app.auth import authenticate_user, drain_rehashes, verify_password
+from app.database import session_scope
+from app.models import User
+from app.passwords import build_context, calibrate_bcrypt
+
+def test_cost_changes_need_update():
+    old_hash = build_context(["bcrypt"], bcrypt_rounds=4).hash("secret")
+    context = build_context(["bcrypt"], bcrypt_rounds=5)
+    assert context.verify("secret", old_hash)
+    assert context.needs_update(old_hash)
+    assert not context.needs_update(context.hash("secret"))
+
+def test_unknown_scheme_rejected():
+    with pytest.raises(ValueError):
+        build_context(["md5_crypt"])
+
+def test_argon2_preferred_over_bcrypt():
+    pytest.importorskip("argon2")
+    context = build_context(["argon2", "bcrypt"], argon2_memory_cost=1024, argon2_time_cost=1, argon2_parallelism=1)
+    assert context.hash("secret").startswith("$argon2id$")
+    assert context.needs_update(build_context(["bcrypt"], bcrypt_rounds=4).hash("secret"))
+
+def test_calibration_respects_target():
+    assert calibrate_bcrypt(target_ms=0.001, samples=1) == {"BCRYPT_ROUNDS": 4}
+
+def test_login_upgrades_hash_in_background(monkeypatch):
+    monkeypatch.setattr(app.auth, "pwd_context", build_context(["bcrypt"], bcrypt_rounds=5))
+    old_hash = build_context(["bcrypt"], bcrypt_rounds=4).hash("testpassword123")
+
+    async def scenario():
+        async with session_scope() as db:
+            db.add(User(email="rehash@example.com", username="rehash", hashed_password=old_hash, is_verified=True))
+            await db.commit()
+            assert await authenticate_user(db, "rehash", "testpassword123") is not None
+        await drain_rehashes()
+        async with session_scope() as db:
+            return (await db.execute(select(User.hashed_password).where(User.username == "rehash"))).scalar_one()
+
+    new_hash = asyncio.run(scenario())
+    assert new_hash != old_hash
+    assert new_hash.startswith("$2b$05$")
+    assert verify_password("testpassword123", new_hash)
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache.memory import MemoryBackend
+from app.rate_limit import LoginThrottle, LoginThrottled, login_throttle
+
+@pytest.mark.asyncio
+async def test_lockouts_escalate():
+    now = [10000.0]
+    throttle = LoginThrottle(MemoryBackend(), failure_limit=3, lockout_base=60, lockout_max=200, clock=lambda: now[0])
+
+    for expected_lockout in (60, 120, 200):
+        for _ in range(3):
+            await throttle.check("alice", "1.2.3.4")
+            await throttle.record_failure("alice")
+        with pytest.raises(LoginThrottled) as exc_info:
+            await throttle.check("alice", "1.2.3.4")
+        assert exc_info.value.retry_after == expected_lockout
+        now[0] += expected_lockout
+
+    await throttle.check("alice", "1.2.3.4")  # Lockout over
+    await throttle.record_success("alice")
+    await throttle.record_failure("alice")
+    await throttle.check("alice", "1.2.3.4")
+
+@pytest.mark.asyncio
+async def test_ip_sliding_window():
+    now = [6000.0]
+    throttle = LoginThrottle(MemoryBackend(), ip_limit=4, ip_window=60, clock=lambda: now[0])
+    for i in range(4):
+        await throttle.check(f"user{i}", "9.9.9.9")
+    with pytest.raises(LoginThrottled):
+        await throttle.check("user4", "9.9.9.9")
+    await throttle.check("user4", "8.8.8.8")  # Other clients unaffected
+
+    # Halfway through the next window, half of the previous five attempts
+    # (refused ones included) still count
+    now[0] += 90
+    await throttle.check("user5", "9.9.9.9")
+    with pytest.raises(LoginThrottled):
+        await throttle.check("user5", "9.9.9.9")
+
+@pytest.mark.asyncio
+async def test_in_flight_cap_rejects_immediately():
+    throttle = LoginThrottle(MemoryBackend(), max_in_flight=1)
+    async with throttle.verifying():
+        with pytest.raises(LoginThrottled):
+            async with throttle.verifying():
+                pass
+    async with throttle.verifying():
+        assert throttle.in_flight == 1
+
+def test_login_locked_before_password_check(client: TestClient, monkeypatch):
+    monkeypatch.setattr(login_throttle, "failure_limit", 2)
+    for _ in range(2):
+        response = client.post("/auth/login", json={"username": "nobody", "password": "wrong"})
+        assert response.status_code == 401
+    response = client.post("/auth/login", json={"username": "nobody", "password": "wrong"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+
+    asyncio.run(login_throttle.unlock("nobody"))
+    assert client.post("/auth/login", json={"username": "nobody", "password": "wrong"}).status_code == 401
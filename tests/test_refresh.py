@@ -0,0 +1,67 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+import app.auth
+from app.database import session_scope
+from app.models import EmailOutbox
+
+def _login(client: TestClient, username: str) -> dict:
+    client.post(
+        "/auth/register",
+        json={"email": f"{username}@example.com", "username": username, "password": "testpassword123"},
+    )
+
+    async def fetch_token():
+        async with session_scope() as db:
+            result = await db.execute(
+                select(EmailOutbox.payload).where(EmailOutbox.to_email == f"{username}@example.com")
+            )
+            return result.scalar_one()["token"]
+
+    client.post("/auth/verify-email", json={"token": asyncio.run(fetch_token())})
+    response = client.post("/auth/login", json={"username": username, "password": "testpassword123"})
+    assert response.status_code == 200
+    return response.json()
+
+def test_refresh_rotates_without_password_hashing(client: TestClient, monkeypatch):
+    tokens = _login(client, "refreshuser")
+
+    async def no_hashing(*args):
+        raise AssertionError("refresh must not hash passwords")
+
+    monkeypatch.setattr(app.auth, "verify_password_async", no_hashing)
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert response.status_code == 200
+    assert response.json()["username"] == "refreshuser"
+
+def test_reused_refresh_token_revokes_family(client: TestClient):
+    tokens = _login(client, "replayuser")
+    rotated = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+
+    # Replaying the first token kills the session, including the rotated token
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]}).status_code == 401
+
+    # A fresh login starts a new family
+    fresh = client.post("/auth/login", json={"username": "replayuser", "password": "testpassword123"}).json()
+    assert client.post("/auth/refresh", json={"refresh_token": fresh["refresh_token"]}).status_code == 200
+
+def test_logout_revokes_refresh_token(client: TestClient):
+    tokens = _login(client, "logoutrefresh")
+    response = client.post(
+        "/auth/logout",
+        json={"refresh_token": tokens["refresh_token"]},
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert response.status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+def test_unknown_refresh_token_rejected(client: TestClient):
+    assert client.post("/auth/refresh", json={"refresh_token": "not-a-token"}).status_code == 401
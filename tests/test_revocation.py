@@ -0,0 +1,60 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import access_token_claims, create_access_token
+from app.cache.memory import MemoryBackend
+from app.config import settings
+from app.models import User
+from app.revocation import BloomFilter, RevocationList
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+@pytest.mark.asyncio
+async def test_revocation_expires_with_token():
+    now = [1000.0]
+    revocations = RevocationList(MemoryBackend(), capacity=100, clock=lambda: now[0])
+    await revocations.revoke("abc", exp=1060)
+    assert await revocations.is_revoked("abc")
+    assert not await revocations.is_revoked("def")
+
+    now[0] = 1061
+    revocations.compact()
+    assert "abc" not in revocations._known
+    assert not await revocations.is_revoked("abc")
+
+@pytest.mark.asyncio
+async def test_sync_loads_revocations_from_other_workers():
+    backend = MemoryBackend()
+    await RevocationList(backend).revoke("abc", exp=time.time() + 60)
+
+    other_worker = RevocationList(backend)
+    assert not await other_worker.is_revoked("abc")  # Not in its filter yet
+    await other_worker.sync()
+    assert await other_worker.is_revoked("abc")
+
+def test_logout_revokes_token(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "jwt_stateless_auth", True)
+    user = User(
+        id=998, email="logout@example.com", username="logout", is_active=True, is_verified=True,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+    token = create_access_token(access_token_claims(user))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+    # A fresh token for the same user is unaffected
+    other = create_access_token(access_token_claims(user))
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {other}"}).status_code == 200
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app.auth import access_token_claims, create_access_token
+from app.config import settings
+from app.models import User
+
+def _unsaved_user() -> User:
+    # Never added to the database: /auth/me can only succeed from token claims
+    return User(
+        id=999,
+        email="stateless@example.com",
+        username="stateless",
+        is_active=True,
+        is_verified=True,
+        token_version=3,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+def test_me_served_from_token_claims(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "jwt_stateless_auth", True)
+    token = create_access_token(access_token_claims(_unsaved_user()))
+
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == 999
+    assert data["username"] == "stateless"
+    assert data["email"] == "stateless@example.com"
+
+def test_claims_ignored_when_stateless_disabled(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "jwt_stateless_auth", True)
+    token = create_access_token(access_token_claims(_unsaved_user()))
+    monkeypatch.setattr(settings, "jwt_stateless_auth", False)
+
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
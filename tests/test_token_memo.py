@@ -0,0 +1,47 @@
+import asyncio
+import time
+from datetime import timedelta
+
+from app.auth import create_access_token, verify_token
+from app.revocation import revocation_list
+from app.schemas import TokenData
+from app.token_memo import TokenMemo, token_memo
+
+def test_entries_expire_before_token():
+    now = [1000.0]
+    memo = TokenMemo(maxsize=10, skew=5, clock=lambda: now[0])
+    memo.put("abc", TokenData(username="alice", jti="j1", expires_at=1060))
+    assert memo.get("abc").username == "alice"
+
+    now[0] = 1055
+    assert memo.get("abc") is None
+    assert memo.stats()["hits"] == 1
+
+def test_bounded_and_discarded_by_jti():
+    memo = TokenMemo(maxsize=2)
+    exp = int(time.time()) + 600
+    for i in range(3):
+        memo.put(f"token-{i}", TokenData(username="alice", jti=f"j{i}", expires_at=exp))
+    assert memo.get("token-0") is None
+    assert memo.get("token-2") is not None
+
+    memo.discard_jti("j2")
+    assert memo.get("token-2") is None
+    assert memo.stats()["size"] == 1
+
+def test_repeated_token_decoded_once():
+    token = create_access_token({"sub": "alice"}, expires_delta=timedelta(minutes=5))
+    first = asyncio.run(verify_token(token))
+    second = asyncio.run(verify_token(token))
+    assert first is second
+    assert token_memo.decodes >= 1
+    assert token_memo.stats()["hits"] >= 1
+
+def test_revocation_drops_memo_entry():
+    token = create_access_token({"sub": "alice"}, expires_delta=timedelta(minutes=5))
+    token_data = asyncio.run(verify_token(token))
+    assert token_memo.get(token) is not None
+
+    asyncio.run(revocation_list.revoke(token_data.jti, token_data.expires_at))
+    assert token_memo.get(token) is None
+    assert asyncio.run(verify_token(token)) is None
@@ -0,0 +1,58 @@
+from app.user_cache import UserCache, UserSnapshot
+
+def _snapshot(user_id: int) -> UserSnapshot:
+    return UserSnapshot(
+        id=user_id,
+        email=f"user{user_id}@example.com",
+        username=f"user{user_id}",
+        hashed_password="x",
+        is_active=True,
+        is_verified=True,
+        token_version=0,
+        created_at=None,
+        verified_at=None,
+    )
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_lookup_by_every_key():
+    cache = UserCache(maxsize=30, ttl=60)
+    snapshot = _snapshot(1)
+    cache.put(snapshot)
+    assert cache.get("id", 1) is snapshot
+    assert cache.get("username", "user1") is snapshot
+    assert cache.get("email", "user1@example.com") is snapshot
+    assert cache.get("username", "missing") is None
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = UserCache(maxsize=30, ttl=10, clock=clock)
+    cache.put(_snapshot(1))
+    clock.now = 9
+    assert cache.get("id", 1) is not None
+    clock.now = 10
+    assert cache.get("id", 1) is None
+
+def test_least_recently_used_keys_are_evicted():
+    cache = UserCache(maxsize=6, ttl=60)
+    cache.put(_snapshot(1))
+    cache.put(_snapshot(2))
+    cache.get("id", 1)
+    cache.put(_snapshot(3))
+    assert cache.get("id", 2) is None
+    assert cache.get("id", 1) is not None
+    assert cache.stats()["evictions"] == 3
+
+def test_invalidate_drops_all_keys_of_user():
+    cache = UserCache(maxsize=30, ttl=60)
+    cache.put(_snapshot(1))
+    cache.invalidate(email="user1@example.com")
+    assert cache.get("id", 1) is None
+    assert cache.get("username", "user1") is None
@@ -0,0 +1,62 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.auth import hash_token, purge_expired_verification_tokens
+from app.database import session_scope
+from app.models import EmailOutbox, User, VerificationToken
+
+def _register(client: TestClient, username: str) -> str:
+    response = client.post(
+        "/auth/register",
+        json={"email": f"{username}@example.com", "username": username, "password": "testpassword123"},
+    )
+    assert response.status_code == 201
+
+    async def fetch_token():
+        async with session_scope() as db:
+            result = await db.execute(
+                select(EmailOutbox.payload).where(EmailOutbox.to_email == f"{username}@example.com")
+            )
+            return result.scalar_one()["token"]
+
+    return asyncio.run(fetch_token())
+
+async def _tokens_for(username: str):
+    async with session_scope() as db:
+        result = await db.execute(
+            select(VerificationToken).join(User, User.id == VerificationToken.user_id).where(User.username == username)
+        )
+        return list(result.scalars().all())
+
+def test_only_token_digest_is_stored_and_consumed_on_verify(client: TestClient):
+    token = _register(client, "digestuser")
+    tokens = asyncio.run(_tokens_for("digestuser"))
+    assert [row.token_hash for row in tokens] == [hash_token(token)]
+
+    assert client.post("/auth/verify-email", json={"token": token}).status_code == 200
+    assert asyncio.run(_tokens_for("digestuser")) == []
+    assert client.post("/auth/verify-email", json={"token": token}).status_code == 400
+
+def test_expired_tokens_are_rejected_and_purged(client: TestClient):
+    token = _register(client, "expireduser")
+
+    async def expire_and_purge():
+        async with session_scope() as db:
+            await db.execute(
+                update(VerificationToken)
+                .where(VerificationToken.token_hash == hash_token(token))
+                .values(expires_at=datetime.utcnow() - timedelta(minutes=1))
+            )
+            await db.commit()
+        response = client.post("/auth/verify-email", json={"token": token})
+        async with session_scope() as db:
+            removed = await purge_expired_verification_tokens(db)
+        return response, removed
+
+    response, removed = asyncio.run(expire_and_purge())
+    assert response.status_code == 400
+    assert removed >= 1
+    assert asyncio.run(_tokens_for("expireduser")) == []